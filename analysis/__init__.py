@@ -0,0 +1,46 @@
+"""
+Inti analisis format paper ACMIT (dan template jurnal lain lewat profil
+aturan di profiles.toml).
+
+Package ini sengaja tidak meng-import Streamlit, gspread maupun pandas,
+dan PyMuPDF baru di-load saat PDF pertama dianalisis. Jadi bisa dipakai
+dari app, worker, CLI batch, atau benchmark tanpa overhead UI:
+
+    from analysis import analyze
+    result = analyze(pdf_bytes)
+"""
+
+from .cache import ExtractCache, content_hash
+from .heuristics import extract_author, extract_title
+from .pdf import (
+    STATUS_COMPLIANT,
+    STATUS_NON_COMPLIANT,
+    STATUS_PARTIAL,
+    analyze,
+    extract_pdf_features,
+    iter_page_texts,
+)
+from .profiles import DEFAULT_PROFILE, ProfileRegistry, RuleProfile
+from .rules import COLUMNS, HEADINGS, SECTION_SYNONYMS
+from .sections import SectionScanner, detect_heading_presence
+
+__all__ = [
+    "COLUMNS",
+    "DEFAULT_PROFILE",
+    "ExtractCache",
+    "HEADINGS",
+    "ProfileRegistry",
+    "RuleProfile",
+    "SECTION_SYNONYMS",
+    "STATUS_COMPLIANT",
+    "STATUS_NON_COMPLIANT",
+    "STATUS_PARTIAL",
+    "SectionScanner",
+    "analyze",
+    "content_hash",
+    "detect_heading_presence",
+    "extract_author",
+    "extract_pdf_features",
+    "extract_title",
+    "iter_page_texts",
+]
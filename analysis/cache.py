@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def content_hash(data) -> str:
+    """SHA-256 dari isi file PDF (bytes atau memoryview)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExtractCache:
+    """
+    Cache hasil ekstraksi PDF berdasarkan hash isi file.
+
+    Dua tingkat:
+    - LRU di memori (dibatasi jumlah entri), per proses;
+    - folder JSON di disk (dibatasi total ukuran), bertahan setelah
+      restart dan dipakai bersama oleh semua reviewer/proses.
+
+    `namespace` ikut masuk ke key, jadi kalau logika ekstraksi berubah
+    cukup naikkan namespace supaya hasil lama tidak terpakai.
+    """
+
+    def __init__(self, directory, max_entries=128, max_bytes=64 * 1024 * 1024,
+                 namespace="v1"):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _key(self, digest: str) -> str:
+        return f"{digest}-{self.namespace}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, digest: str):
+        key = self._key(digest)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # tandai baru dipakai untuk eviction LRU
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, digest: str, value: dict):
+        key = self._key(digest)
+        with self._lock:
+            self._remember(key, value)
+
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            # Disk penuh / read-only: cache memori tetap jalan.
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._evict_disk()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()  # paling lama tidak dipakai lebih dulu
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
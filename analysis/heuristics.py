@@ -0,0 +1,85 @@
+"""
+Heuristik judul dan author dari baris-baris awal halaman pertama.
+
+Kata-kata yang dicari (blacklist judul, penanda author) berasal dari
+profil aturan (lihat profiles.py); default-nya profil ACMIT bawaan.
+"""
+
+from .profiles import DEFAULT_PROFILE
+
+
+def extract_title(lines, profile=None):
+    profile = profile or DEFAULT_PROFILE
+    blacklist = profile.title_blacklist
+    stop = profile.title_stop
+    max_lookahead = profile.title_lookahead
+
+    for i, line in enumerate(lines[:profile.title_lines]):
+        clean = line.strip()
+        if not clean:
+            continue
+        if len(clean.split()) < 3:
+            continue
+
+        low = clean.lower()
+        if blacklist and blacklist.search(low):
+            continue
+        if sum(ch.isdigit() for ch in clean) > profile.title_max_digits:
+            continue
+
+        title_lines = [clean]
+        last_idx = i
+
+        for j in range(i + 1, min(i + 1 + max_lookahead, len(lines))):
+            nxt = lines[j].strip()
+            if not nxt:
+                break
+            nxt_low = nxt.lower()
+
+            if stop and stop.search(nxt_low):
+                break
+            if blacklist and blacklist.search(nxt_low):
+                break
+            if any(ch.isdigit() for ch in nxt):
+                break
+
+            if 2 <= len(nxt.split()) <= 12:
+                title_lines.append(nxt)
+                last_idx = j
+            else:
+                break
+
+        return " ".join(title_lines), last_idx
+
+    for i, line in enumerate(lines):
+        clean = line.strip()
+        if clean:
+            return clean, i
+    return "", -1
+
+
+def extract_author(lines, start_idx, profile=None):
+    profile = profile or DEFAULT_PROFILE
+    markers = profile.author_markers
+    if start_idx < 0:
+        search_start = 0
+    else:
+        search_start = start_idx + 1
+
+    for line in lines[search_start : search_start + profile.author_lines]:
+        clean = line.strip()
+        if not clean:
+            continue
+
+        words = clean.split()
+        if not (profile.author_min_words <= len(words) <= profile.author_max_words):
+            continue
+
+        cap_words = [w for w in words if w[0].isupper()]
+        if len(cap_words) < 2:
+            continue
+
+        if markers and markers.search(clean.lower()):
+            return clean
+
+    return ""
@@ -0,0 +1,146 @@
+"""
+Ekstraksi PDF (PyMuPDF) + heuristik format, tanpa Streamlit/gspread.
+
+`fitz` baru di-import saat PDF pertama dibuka supaya `import analysis`
+tetap ringan untuk worker, CLI dan benchmark.
+"""
+
+import os
+import time
+
+from .heuristics import extract_author, extract_title
+from .profiles import DEFAULT_PROFILE
+from .rules import HEADINGS
+
+STATUS_COMPLIANT = "✅ Compliant"
+STATUS_NON_COMPLIANT = "❌ Non-compliant"
+STATUS_PARTIAL = "⚠️ Partially checked"
+
+# extract_title melihat 40 baris pertama (+4 lookahead), extract_author
+# 10 baris sesudah judul -> cukup kumpulkan ~60 baris awal dokumen
+# (lebih banyak kalau profil aturan meminta scan_lines yang lebih besar).
+HEAD_LINES = 60
+
+
+def iter_page_texts(doc, max_pages=None):
+    """Yield teks per halaman satu per satu (tidak disimpan semuanya)."""
+    for page_no, page in enumerate(doc):
+        if max_pages is not None and page_no >= max_pages:
+            break
+        yield page_no, page.get_text()
+
+
+def _open(source):
+    import fitz  # PyMuPDF
+
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def extract_pdf_features(pdf_bytes, max_pages=None, timings=None,
+                         profile=None) -> dict:
+    """
+    Jalankan semua heuristik format untuk satu PDF.
+    Hasilnya JSON-serializable supaya bisa disimpan di ExtractCache.
+
+    `pdf_bytes` boleh bytes/memoryview (dibuka dari memori) atau path
+    file (dibuka dari disk, untuk upload besar yang di-spill).
+
+    Halaman dibaca satu per satu: judul/author hanya dari baris-baris
+    awal, dan pembacaan berhenti begitu semua section sudah ditemukan.
+    `max_pages` (default: tanpa batas; streaming per halaman sudah
+    membatasi memori) membatasi jumlah halaman yang dibaca. Kalau batas
+    itu tercapai sebelum semua section ketemu, `truncated` bernilai True
+    dan section yang belum ketemu berarti "belum dicek", bukan hilang.
+    Kalau `timings` (dict) diisi, durasi tiap tahap (detik) ditambahkan
+    ke situ: pdf.open, pdf.get_text, pdf.sections, pdf.title, pdf.author.
+    `profile` (RuleProfile, lihat profiles.py) menentukan aturan judul,
+    author dan synonym section; default profil ACMIT bawaan.
+    """
+    profile = profile or DEFAULT_PROFILE
+    head_lines = max(
+        HEAD_LINES,
+        profile.title_lines + profile.title_lookahead + profile.author_lines,
+    )
+    head_parts = []
+    head_newlines = 0
+    head_done = False
+    scanner = profile.scanner()
+    pages_read = 0
+    scan_time = 0.0
+    clock = time.perf_counter
+
+    started = clock()
+    with _open(pdf_bytes) as doc:
+        opened = clock()
+        page_count = doc.page_count
+        for _, page_text in iter_page_texts(doc, max_pages):
+            pages_read += 1
+
+            if not head_done:
+                head_parts.append(page_text)
+                head_newlines += page_text.count("\n")
+                head_done = head_newlines >= head_lines and any(
+                    part.strip() for part in head_parts
+                )
+
+            t0 = clock()
+            scanner.feed(page_text)
+            scan_time += clock() - t0
+            if head_done and scanner.complete:
+                break
+        read = clock()
+
+    lines = "".join(head_parts).split("\n") if head_parts else []
+
+    title, title_last_idx = extract_title(lines, profile)
+    titled = clock()
+    author = extract_author(lines, title_last_idx, profile)
+    if timings is not None:
+        timings["pdf.open"] = opened - started
+        timings["pdf.get_text"] = read - opened - scan_time
+        timings["pdf.sections"] = scan_time
+        timings["pdf.title"] = titled - read
+        timings["pdf.author"] = clock() - titled
+
+    features = {
+        "title": title,
+        "student_author": author,
+        "pages_read": pages_read,
+        "page_count": page_count,
+        "truncated": pages_read < page_count and not scanner.complete,
+        "sections": scanner.hits,
+        "rule_profile": f"{profile.name}@{profile.version}",
+    }
+    for heading in HEADINGS:
+        features[heading.capitalize()] = int(heading in scanner.hits)
+    return features
+
+
+def analyze(pdf_bytes, max_pages=None, timings=None, profile=None) -> dict:
+    """
+    Analisis satu PDF: fitur format + daftar section yang hilang + status.
+
+    Hasilnya dict biasa (JSON-serializable), kolomnya mengikuti nama di
+    `COLUMNS` untuk title, student_author, status dan flag section.
+    Kalau pembacaan terpotong `max_pages`, section yang belum ketemu masuk
+    `unchecked_sections` (status STATUS_PARTIAL), bukan `missing_sections`.
+    """
+    result = extract_pdf_features(
+        pdf_bytes, max_pages=max_pages, timings=timings, profile=profile
+    )
+    not_found = [h for h in HEADINGS if result[h.capitalize()] == 0]
+    if result["truncated"]:
+        result["missing_sections"] = []
+        result["unchecked_sections"] = not_found
+    else:
+        result["missing_sections"] = not_found
+        result["unchecked_sections"] = []
+    if result["missing_sections"]:
+        result["status"] = STATUS_NON_COMPLIANT
+    elif result["unchecked_sections"]:
+        result["status"] = STATUS_PARTIAL
+    else:
+        result["status"] = STATUS_COMPLIANT
+    return result
@@ -0,0 +1,287 @@
+"""
+Profil aturan format per template jurnal (ACMIT, IEEE, Elsevier, ...).
+
+Aturan judul, author dan synonym section dibaca dari file TOML
+(`profiles.toml` di package ini, atau path lain lewat ProfileRegistry):
+
+    schema = 1
+    default = "acmit"
+
+    [profiles.ieee]
+    version = "2025.1"
+    label = "IEEE-style"
+    extends = "acmit"          # tabel yang tidak diisi diambil dari acmit
+
+    [profiles.ieee.sections]
+    "materials and methods" = ["methodology", "proposed method", ...]
+
+    [profiles.ieee.title]
+    blacklist = ["ieee", "transactions on", ...]
+
+Setiap profil dikompilasi sekali menjadi RuleProfile: daftar kata
+(blacklist judul, kata penghenti, penanda author, synonym section)
+digabung jadi satu regex trie, jadi biaya per baris praktis tidak
+bertambah walaupun daftar aturannya bertambah panjang. ProfileRegistry
+mengecek mtime file secara berkala dan me-reload kalau berubah; file
+yang rusak di-log dan profil lama tetap dipakai.
+
+`RuleProfile.key` (nama, versi, hash isi aturan) dipakai sebagai bagian
+key cache hasil ekstraksi, jadi edit aturan otomatis membuat hasil lama
+tidak terpakai.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from .rules import (
+    AUTHOR_MARKERS,
+    HEADINGS,
+    SECTION_SYNONYMS,
+    TITLE_BLACKLIST,
+    TITLE_STOP,
+)
+from .sections import SectionScanner, _trie_pattern
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+log = logging.getLogger(__name__)
+
+SCHEMA = 1
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "profiles.toml"
+)
+TABLES = ("sections", "title", "author")
+
+
+def _table(name, spec, key) -> dict:
+    value = spec.get(key, {})
+    if not isinstance(value, dict):
+        raise ValueError(f"profile {name!r}: [{key}] must be a table")
+    return value
+
+
+def _strings(name, where, value, allow_empty=True) -> list:
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"profile {name!r}: {where} must be a list of strings")
+    if not allow_empty and not any(v.strip() for v in value):
+        # Section tanpa synonym tidak akan pernah terdeteksi.
+        raise ValueError(f"profile {name!r}: {where} must not be empty")
+    return value
+
+
+def _matcher(phrases):
+    """Satu regex trie untuk semua frasa (lowercase); None kalau kosong."""
+    phrases = sorted({p.lower() for p in phrases if p})
+    return re.compile(_trie_pattern(phrases)) if phrases else None
+
+
+class RuleProfile:
+    """Satu profil yang sudah dikompilasi. Bisa di-pickle (dikirim ke worker)."""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.spec = spec
+        self.version = str(spec.get("version", "0"))
+        self.label = spec.get("label", name)
+        if not isinstance(self.label, str) or not self.label.strip():
+            raise ValueError(f"profile {name!r}: label must be a non-empty string")
+        digest = hashlib.sha256(
+            json.dumps(spec, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        self.key = f"{name}@{self.version}-{digest[:12]}"
+
+        sections = _table(name, spec, "sections")
+        unknown = sorted(set(sections) - set(HEADINGS))
+        if unknown:
+            raise ValueError(f"profile {name!r}: unknown sections {unknown}")
+        self.synonyms = {
+            heading: [
+                p.lower() for p in _strings(
+                    name, f"sections.{heading!r}", sections.get(heading, [heading]),
+                    allow_empty=False,
+                )
+            ]
+            for heading in HEADINGS
+        }
+
+        title = _table(name, spec, "title")
+        self.title_blacklist = _matcher(
+            _strings(name, "title.blacklist", title.get("blacklist", []))
+        )
+        self.title_stop = _matcher(
+            _strings(name, "title.stop", title.get("stop", []))
+        )
+        self.title_lines = int(title.get("scan_lines", 40))
+        self.title_lookahead = int(title.get("max_lookahead", 4))
+        self.title_max_digits = int(title.get("max_digits", 4))
+
+        author = _table(name, spec, "author")
+        self.author_markers = _matcher(
+            _strings(name, "author.markers", author.get("markers", []))
+        )
+        self.author_lines = int(author.get("scan_lines", 10))
+        self.author_min_words = int(author.get("min_words", 2))
+        self.author_max_words = int(author.get("max_words", 25))
+
+        self.scanner()  # kompilasi regex section sekarang, bukan saat PDF pertama
+
+    def scanner(self) -> SectionScanner:
+        return SectionScanner(self.synonyms)
+
+    def __reduce__(self):
+        return _restore, (self.name, self.spec, self.key)
+
+    def __repr__(self):
+        return f"RuleProfile({self.key!r})"
+
+
+_restored = {}
+
+
+def _restore(name, spec, key):
+    """Unpickle di worker: profil yang sama dikompilasi sekali saja."""
+    profile = _restored.get(key)
+    if profile is None:
+        profile = _restored[key] = RuleProfile(name, spec)
+    return profile
+
+
+DEFAULT_PROFILE = RuleProfile("acmit", {
+    "version": "builtin",
+    "label": "ACMIT",
+    "sections": SECTION_SYNONYMS,
+    "title": {"blacklist": TITLE_BLACKLIST, "stop": TITLE_STOP},
+    "author": {"markers": AUTHOR_MARKERS},
+})
+
+
+def compile_profiles(config) -> dict:
+    """{nama: RuleProfile} dari isi file TOML; raise ValueError kalau tidak valid."""
+    schema = config.get("schema", SCHEMA)
+    if schema != SCHEMA:
+        raise ValueError(f"unsupported rules schema {schema!r}")
+    raw = config.get("profiles", {})
+    if not isinstance(raw, dict) or not raw:
+        raise ValueError("no [profiles.*] tables")
+    for name, spec in raw.items():
+        if not isinstance(spec, dict):
+            raise ValueError(f"profile {name!r} must be a table")
+        for table in TABLES:
+            _table(name, spec, table)
+
+    def resolve(name, seen=()):
+        if name not in raw:
+            raise ValueError(f"unknown profile {name!r}")
+        if name in seen:
+            raise ValueError(f"profile inheritance loop at {name!r}")
+        spec = dict(raw[name])
+        parent = spec.pop("extends", None)
+        if parent is None:
+            return spec
+        merged = resolve(parent, seen + (name,))
+        for table in TABLES:
+            merged[table] = {**merged.get(table, {}), **spec.pop(table, {})}
+        merged.update(spec)
+        return merged
+
+    return {name: RuleProfile(name, resolve(name)) for name in raw}
+
+
+class ProfileSnapshot:
+    """
+    Isi ProfileRegistry pada satu saat. Dipakai selama satu render supaya
+    `names()` dan `get()` konsisten walaupun file di-reload di tengahnya.
+    """
+
+    def __init__(self, profiles, default, error=None, path=None):
+        self._profiles = profiles
+        self.default = default
+        self.error = error
+        self.path = path
+
+    def names(self) -> list:
+        return list(self._profiles)
+
+    def get(self, name=None) -> RuleProfile:
+        """Profil `name` (None = default). Raise KeyError kalau tidak ada."""
+        return self._profiles[name or self.default]
+
+
+class ProfileRegistry:
+    """
+    Profil dari file TOML `path`, di-reload otomatis kalau file berubah
+    (dicek paling sering tiap `check_interval` detik). Kalau file tidak
+    ada, hanya profil bawaan DEFAULT_PROFILE yang tersedia. File yang
+    gagal di-load dicoba lagi di pengecekan berikutnya; mtime baru
+    dicatat setelah berhasil.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.default = DEFAULT_PROFILE.name
+        self.error = None
+        self.reloads = 0
+        self._profiles = {DEFAULT_PROFILE.name: DEFAULT_PROFILE}
+        self._mtime = None
+        self._checked = None
+        self._lock = threading.Lock()
+        self._refresh(force=True)
+
+    def _refresh(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._checked < self.check_interval:
+                return
+            self._checked = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime == self._mtime:
+                return
+            if mtime is None:
+                self._mtime = None
+                return
+            try:
+                with open(self.path, "rb") as f:
+                    config = tomllib.load(f)
+                profiles = compile_profiles(config)
+                default = config.get("default", next(iter(profiles)))
+                if default not in profiles:
+                    raise ValueError(f"default profile {default!r} is not defined")
+            except (OSError, TypeError, ValueError) as e:  # termasuk TOMLDecodeError
+                error = f"{type(e).__name__}: {e}"
+                if error != self.error:
+                    log.error("Could not load rule profiles from %s: %s", self.path, e)
+                self.error = error
+                return
+            self._mtime = mtime
+            self._profiles = profiles
+            self.default = default
+            self.error = None
+            self.reloads += 1
+
+    def snapshot(self) -> ProfileSnapshot:
+        self._refresh()
+        with self._lock:
+            return ProfileSnapshot(
+                dict(self._profiles), self.default, self.error, self.path
+            )
+
+    def names(self) -> list:
+        self._refresh()
+        return list(self._profiles)
+
+    def get(self, name=None) -> RuleProfile:
+        """Profil `name` (None = default). Raise KeyError kalau tidak ada."""
+        self._refresh()
+        return self._profiles[name or self.default]
@@ -0,0 +1,90 @@
+"""
+Aturan format paper: section wajib, synonym-nya, dan kolom hasil review.
+"""
+
+HEADINGS = [
+    "introduction",
+    "materials and methods",
+    "results and discussion",
+    "conclusion",
+    "references",
+]
+
+SECTION_SYNONYMS = {
+    "introduction": ["introduction", "intro"],
+    "materials and methods": [
+        "materials and methods",
+        "material and methods",
+        "materials & methods",
+        "materials and method",
+        "methodology",
+        "methods and materials",
+    ],
+    "results and discussion": [
+        "results and discussion",
+        "result and discussion",
+        "results & discussion",
+        "results",
+        "discussion",
+    ],
+    "conclusion": ["conclusion", "conclusions", "concluding remarks"],
+    "references": ["references", "reference", "bibliography"],
+}
+
+# Default heuristik judul/author (profil "acmit" bawaan). Profil lain
+# (IEEE, Elsevier, ...) ada di profiles.toml; lihat profiles.py.
+TITLE_BLACKLIST = [
+    "journal",
+    "proceedings",
+    "sciencedirect",
+    "science direct",
+    "elsevier",
+    "www.",
+    "http",
+    "received",
+    "accepted",
+    "available online",
+    "contents list",
+    "volume",
+    "issue",
+    "open access",
+    "license",
+    "creativecommons",
+]
+TITLE_STOP = ["abstract"]
+AUTHOR_MARKERS = [",", ";", " and ", "."]
+
+COLUMNS = [
+    "timestamp",
+    "reviewer_user",
+    "reviewer_role",
+    "file_name",
+    "title",
+    "student_author",
+    "status",
+    "Introduction",
+    "Materials and methods",
+    "Results and discussion",
+    "Conclusion",
+    "References",
+    "advisor",
+    "reviewed_by",
+    "english_ok",
+    "english_issue",
+    "format_ok",
+    "format_comment",
+    "sota_ok",
+    "clarity_ok",
+    "figures_ok",
+    "figures_comment",
+    "conclusion_ok",
+    "conclusion_comment",
+    "references_ok",
+    "references_comment",
+    "recommendations",
+    "overall_eval",
+    # SHA-256 isi PDF (analysis.content_hash): paper yang sama ketemu lewat
+    # kolom ini walaupun nama file atau reviewer-nya beda. Kolom terakhir,
+    # supaya sheet/database lama cukup ditambah satu kolom di ujung.
+    "content_hash",
+]
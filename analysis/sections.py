@@ -0,0 +1,124 @@
+"""
+Deteksi section wajib (Introduction, Methods, ...) dalam satu pass.
+"""
+
+import re
+from functools import lru_cache
+
+from .rules import HEADINGS, SECTION_SYNONYMS
+
+
+def _trie_pattern(phrases) -> str:
+    """
+    Gabungkan semua frasa jadi satu regex berbentuk trie, mis.
+    ["intro", "introduction"] -> "intro(?:duction)?". Di tiap posisi regex
+    cukup mengikuti satu cabang, jadi biaya per karakter hampir tidak
+    bertambah walaupun jumlah frasa bertambah. Match terpanjang menang.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        optional = "" in node
+        alts = [
+            re.escape(ch) + build(child)
+            for ch, child in sorted(node.items())
+            if ch
+        ]
+        if not alts:
+            return ""
+        if len(alts) == 1 and not optional:
+            return alts[0]
+        group = "(?:" + "|".join(alts) + ")"
+        return group + "?" if optional else group
+
+    return build(trie)
+
+
+@lru_cache(maxsize=32)
+def _compile(phrases):
+    """Regex trie + panjang overlap untuk tuple frasa; dikompilasi sekali."""
+    return re.compile(_trie_pattern(phrases)), max(len(p) for p in phrases) - 1
+
+
+class SectionScanner:
+    """
+    Pencari semua synonym semua section dalam satu pass.
+
+    Untuk tiap heading disimpan kemunculan pertamanya: offset karakter
+    (di teks lowercase gabungan semua halaman), nomor baris dan nomor
+    halaman (0-based). Teks bisa di-`feed` per halaman; frasa yang
+    terpotong di batas halaman tetap ketemu lewat overlap kecil.
+    """
+
+    def __init__(self, synonyms=None, headings=None):
+        synonyms = SECTION_SYNONYMS if synonyms is None else synonyms
+        self.headings = list(HEADINGS if headings is None else headings)
+        self._heading_of = {}
+        for heading in self.headings:
+            for phrase in synonyms.get(heading, [heading]):
+                self._heading_of.setdefault(phrase.lower(), heading)
+        self._pattern, self._overlap = _compile(tuple(self._heading_of))
+        self.reset()
+
+    def reset(self):
+        self.hits = {}
+        self._tail = ""
+        self._offset = 0
+        self._line = 0
+        self._page = 0
+
+    @property
+    def complete(self) -> bool:
+        return len(self.hits) == len(self.headings)
+
+    def feed(self, page_text: str):
+        """Scan satu halaman berikutnya."""
+        low = page_text.lower()
+        tail_len = len(self._tail)
+        window = self._tail + low
+        base = self._offset - tail_len
+        line = self._line - self._tail.count("\n")
+        last = 0
+
+        if not self.complete:
+            for m in self._pattern.finditer(window):
+                if m.end() <= tail_len:
+                    continue  # sudah dilihat di halaman sebelumnya
+                heading = self._heading_of[m.group(0)]
+                if heading in self.hits:
+                    continue
+                line += window.count("\n", last, m.start())
+                last = m.start()
+                self.hits[heading] = {
+                    "offset": base + m.start(),
+                    "line": line,
+                    "page": self._page if m.start() >= tail_len else self._page - 1,
+                }
+                if self.complete:
+                    break
+
+        self._offset += len(low)
+        self._line += low.count("\n")
+        self._page += 1
+        self._tail = window[-self._overlap:] if self._overlap else ""
+
+    def scan(self, text: str) -> dict:
+        """Scan teks utuh sekaligus; kembalikan index {heading: posisi}."""
+        self.reset()
+        self.feed(text)
+        return self.hits
+
+    def order(self) -> list:
+        """Heading yang ditemukan, urut sesuai posisi di dokumen."""
+        return sorted(self.hits, key=lambda h: self.hits[h]["offset"])
+
+
+def detect_heading_presence(full_text: str, section_key: str) -> int:
+    if not full_text:
+        return 0
+    return int(section_key in SectionScanner().scan(full_text))
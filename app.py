@@ -1,11 +1,30 @@
+from __future__ import annotations
+
+import threading
+import time
+
 import streamlit as st
-import pandas as pd
-import fitz  # PyMuPDF
 from datetime import datetime
+from importlib import import_module
+from importlib.util import find_spec
+from uuid import uuid4
 from streamlit.components.v1 import html
 
-import gspread
-from google.oauth2.service_account import Credentials
+from analysis import (
+    COLUMNS,
+    DEFAULT_PROFILE,
+    HEADINGS,
+    ExtractCache,
+    ProfileRegistry,
+    content_hash,
+)
+from analysis.profiles import DEFAULT_PATH as DEFAULT_RULES_PATH
+from extract_pool import BudgetExceeded, ExtractPool, MemoryBudget, QueueFull
+from paper_index import PaperIndex
+from perf import configure_log, recorder
+from review_stats import GROUP_COLUMNS, TOTAL, as_tables, missing_rates
+from review_store import open_store
+from sheet_utils import get_pool, get_sheet
 
 # ============================================================
 # KONFIGURASI
@@ -13,72 +32,22 @@ from google.oauth2.service_account import Credentials
 
 SHEET_NAME = "ACMIT_Reviews_2025"  # hanya label, koneksi pakai ID
 
+# Modul berat yang tidak dibutuhkan halaman login. Di-import di thread
+# background setelah halaman login tampil (lihat warm_up_modules), jadi
+# saat user selesai login biasanya sudah siap.
+WARM_UP_MODULES = [
+    "pandas",
+    "review_frame",
+    "gspread",
+    "google.oauth2.service_account",
+]
+
 USERS = {
     "admin": {"password": "admin123", "role": "Admin"},
     "reviewer1": {"password": "rev123", "role": "Reviewer"},
     "reviewer2": {"password": "rev456", "role": "Reviewer"},
 }
 
-HEADINGS = [
-    "introduction",
-    "materials and methods",
-    "results and discussion",
-    "conclusion",
-    "references",
-]
-
-SECTION_SYNONYMS = {
-    "introduction": ["introduction", "intro"],
-    "materials and methods": [
-        "materials and methods",
-        "material and methods",
-        "materials & methods",
-        "materials and method",
-        "methodology",
-        "methods and materials",
-    ],
-    "results and discussion": [
-        "results and discussion",
-        "result and discussion",
-        "results & discussion",
-        "results",
-        "discussion",
-    ],
-    "conclusion": ["conclusion", "conclusions", "concluding remarks"],
-    "references": ["references", "reference", "bibliography"],
-}
-
-COLUMNS = [
-    "timestamp",
-    "reviewer_user",
-    "reviewer_role",
-    "file_name",
-    "title",
-    "student_author",
-    "status",
-    "Introduction",
-    "Materials and methods",
-    "Results and discussion",
-    "Conclusion",
-    "References",
-    "advisor",
-    "reviewed_by",
-    "english_ok",
-    "english_issue",
-    "format_ok",
-    "format_comment",
-    "sota_ok",
-    "clarity_ok",
-    "figures_ok",
-    "figures_comment",
-    "conclusion_ok",
-    "conclusion_comment",
-    "references_ok",
-    "references_comment",
-    "recommendations",
-    "overall_eval",
-]
-
 # ============================================================
 # SETUP STREAMLIT
 # ============================================================
@@ -113,85 +82,103 @@ st.markdown(
 
 def get_worksheet():
     """
-    Konek ke Google Sheet berdasarkan ID dan kembalikan worksheet pertama.
+    Ambil worksheet pertama dari pool koneksi bersama (lihat sheet_utils).
 
-    ID bisa disimpan di:
-    - st.secrets["google_sheet_id"]  (top-level), atau
-    - st.secrets["google_service_account"]["google_sheet_id"]
+    Credentials, authorize dan open_by_key hanya dijalankan sekali per
+    proses; call berikutnya memakai handle yang sama.
     """
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
-    ]
-
-    creds_info = st.secrets["google_service_account"]
-    creds = Credentials.from_service_account_info(creds_info, scopes=scopes)
-    client = gspread.authorize(creds)
-
-    sheet_id = st.secrets.get("google_sheet_id", None)
-    if sheet_id is None:
-        sheet_id = creds_info.get("google_sheet_id", None)
-
-    if sheet_id is None:
-        raise KeyError(
-            'google_sheet_id not found in secrets. '
-            'Tambahkan "google_sheet_id = \\"...ID...\\"" di secrets '
-            "atau di dalam [google_service_account]."
-        )
-
-    sh = client.open_by_key(sheet_id)
-    ws = sh.sheet1
-    return ws
+    return get_sheet()
 
 
-def save_review_to_sheet(summary: dict):
+@st.cache_resource
+def get_review_store():
     """
-    Simpan satu review ke Google Sheet.
-    SELALU tulis ke baris baru (ke bawah), bukan ke samping.
+    Store review per proses. Diatur lewat secrets:
+    - review_store = "sqlite" (default; Google Sheet jadi mirror) atau "sheets"
+    - review_db_path (default ".data/reviews.db")
+    - reviews_cache_ttl (detik, untuk mode "sheets")
+    - sheets_requests_per_minute (rate limit bersama ke Sheets API)
+    - sheets_partition = "semester" (default), "month" atau "none":
+      review ditulis ke worksheet per periode (mis. reviews_2025-S2)
     """
-    try:
-        ws = get_worksheet()
-        values = ws.get_all_values()  # 2D list
+    get_pool().limiter.set_rate(
+        float(st.secrets.get("sheets_requests_per_minute", 60))
+    )
+    return open_store(
+        st.secrets.get("review_store", "sqlite"),
+        path=st.secrets.get("review_db_path", ".data/reviews.db"),
+        ttl=float(st.secrets.get("reviews_cache_ttl", 30)),
+        partition=st.secrets.get("sheets_partition", "semester"),
+    )
 
-        # Kalau sheet kosong -> tulis header di A1
-        if not values:
-            ws.update("A1", [COLUMNS])
-            values = [COLUMNS]
 
-        # next_row = jumlah baris yang sudah terisi + 1
-        next_row = len(values) + 1
-        row_values = [[summary.get(col, "") for col in COLUMNS]]
+def save_review_to_sheet(summary: dict) -> bool:
+    """
+    Simpan satu review lewat review store (lihat review_store.py).
+    SELALU tulis ke baris baru (ke bawah), bukan ke samping.
 
-        ws.update(f"A{next_row}", row_values)
+    Penulisan ke Google Sheet sendiri lewat antrian di background, jadi
+    submit tidak menunggu Sheets API. Kembalikan True kalau tersimpan.
+    """
+    try:
+        with recorder.stage("review.save"):
+            get_review_store().save(summary)
 
-        st.toast("✅ Saved to Google Sheets", icon="✅")
+        st.toast("✅ Review saved", icon="✅")
+        return True
     except Exception as e:
-        st.error(f"❌ Error saving to Google Sheets: {e}")
+        st.error(f"❌ Error saving review: {e}")
+        return False
 
 
-def load_reviews_from_sheet() -> pd.DataFrame:
+def load_reviews_from_sheet(reviewer_user=None, periods=None) -> pd.DataFrame:
     """
-    Load semua review dari Google Sheet ke DataFrame.
+    Load review dari review store ke DataFrame.
+
+    Kalau `reviewer_user` diisi, hanya review milik reviewer itu yang
+    diambil (query ber-index), bukan semua review lalu difilter.
+    `periods` membatasi ke periode tertentu (hanya worksheet itu yang
+    dibaca); None = semua periode.
+
+    Kolom langsung bertipe (flag int8, Yes/No boolean, category, datetime);
+    lihat review_frame.py.
     """
     try:
-        ws = get_worksheet()
-        values = ws.get_all_values()
+        store = get_review_store()
+        # Impor review lama dari sheet yang belum berhasil dicoba lagi
+        # (dibatasi interval di store-nya).
+        store.retry_seed()
+        with recorder.stage("review.load", store=store.name):
+            if reviewer_user is None:
+                header, rows = store.load_all(periods=periods)
+            else:
+                header, rows = store.load_for_reviewer(reviewer_user)
     except Exception as e:
-        st.error(f"❌ Error loading from Google Sheets: {e}")
-        return pd.DataFrame(columns=COLUMNS)
+        st.error(f"❌ Error loading reviews: {e}")
+        return to_frame(COLUMNS, [])
+
+    if not header or not rows:
+        return to_frame(COLUMNS, [])
 
-    if not values or len(values) == 1:
-        return pd.DataFrame(columns=COLUMNS)
+    with recorder.stage("review.frame", rows=len(rows)):
+        return to_frame(header, rows)
 
-    header = values[0]
-    rows = values[1:]
-    df = pd.DataFrame(rows, columns=header)
 
-    for col in COLUMNS:
-        if col not in df.columns:
-            df[col] = ""
+@st.cache_data(max_entries=4, show_spinner=False)
+def _cached_export(fmt: str, data_version, _df: pd.DataFrame) -> bytes:
+    return to_parquet_bytes(_df) if fmt == "parquet" else to_csv_bytes(_df)
 
-    return df
+
+def export_reviews(fmt: str, df: pd.DataFrame, data_version=None) -> bytes:
+    """
+    Isi file export ("csv" atau "parquet"). Dipanggil oleh download
+    button hanya saat diklik. Hasilnya satu objek bytes utuh (tidak
+    di-stream; CSV hanya dikonversi per potongan baris) dan di-cache per
+    `data_version` (lihat ReviewStore.version) sampai ada review baru.
+    """
+    if data_version is None:
+        return _cached_export.__wrapped__(fmt, data_version, df)
+    return _cached_export(fmt, data_version, df)
 
 
 # ============================================================
@@ -221,7 +208,52 @@ def login_block():
             st.rerun()
 
 
+@st.cache_resource(show_spinner=False)
+def warm_up_modules() -> threading.Thread | None:
+    """
+    Import WARM_UP_MODULES sekali per proses di thread background. Durasi
+    tiap import tercatat sebagai stage "warmup.import" di panel Performance.
+    Bisa dimatikan dengan secrets warm_up_modules = false.
+    """
+    # Dipanggil sebelum login: tanpa secrets.toml, st.secrets raise
+    # FileNotFoundError, dan halaman login harus tetap tampil.
+    try:
+        enabled = st.secrets.get("warm_up_modules", True)
+    except FileNotFoundError:
+        enabled = True
+    if not enabled:
+        return None
+
+    def run():
+        for name in WARM_UP_MODULES:
+            try:
+                with recorder.stage("warmup.import", module=name):
+                    import_module(name)
+            except ImportError:
+                continue
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource(show_spinner=False)
+def setup_perf_log():
+    """
+    Record per stage (JSON lines, lihat perf.py) ditulis kalau secrets
+    perf_log diisi: "stderr", "stdout" atau path file. Environment
+    variable PERF_LOG berlaku juga (dibaca saat perf di-import).
+    """
+    try:
+        target = st.secrets.get("perf_log")
+    except FileNotFoundError:  # belum ada secrets.toml
+        target = None
+    configure_log(target)
+
+
+setup_perf_log()
 login_block()
+warm_up_modules()
 
 if "user" not in st.session_state:
     st.info("Please login from the left sidebar to use the app.")
@@ -230,6 +262,11 @@ if "user" not in st.session_state:
 current_user = st.session_state["user"]
 current_role = st.session_state["role"]
 
+# pandas dan review_frame baru di-load setelah login (import menunggu
+# kalau warm-up di background masih berjalan).
+import pandas as pd  # noqa: E402
+from review_frame import to_csv_bytes, to_frame, to_parquet_bytes  # noqa: E402
+
 # ============================================================
 # HEADER UI
 # ============================================================
@@ -255,113 +292,323 @@ st.markdown(
 st.markdown("---")
 
 # ============================================================
-# HELPER PDF & TITLE/AUTHOR HEURISTIC
+# HELPER PDF (logika analisis ada di package `analysis`)
 # ============================================================
 
 
-def detect_heading_presence(full_text: str, section_key: str) -> int:
-    if not full_text:
-        return 0
-    text_low = full_text.lower()
-    for phrase in SECTION_SYNONYMS.get(section_key, [section_key]):
-        if phrase.lower() in text_low:
-            return 1
-    return 0
-
-
-def extract_title(lines):
-    blacklist = [
-        "journal",
-        "proceedings",
-        "sciencedirect",
-        "science direct",
-        "elsevier",
-        "www.",
-        "http",
-        "received",
-        "accepted",
-        "available online",
-        "contents list",
-        "volume",
-        "issue",
-        "open access",
-        "license",
-        "creativecommons",
-    ]
-    max_lookahead = 4
-
-    for i, line in enumerate(lines[:40]):
-        clean = line.strip()
-        if not clean:
-            continue
-        if len(clean.split()) < 3:
-            continue
-
-        low = clean.lower()
-        if any(word in low for word in blacklist):
-            continue
-        if sum(ch.isdigit() for ch in clean) > 4:
-            continue
-
-        title_lines = [clean]
-        last_idx = i
-
-        for j in range(i + 1, min(i + 1 + max_lookahead, len(lines))):
-            nxt = lines[j].strip()
-            if not nxt:
-                break
-            nxt_low = nxt.lower()
-
-            if "abstract" in nxt_low:
-                break
-            if any(word in nxt_low for word in blacklist):
-                break
-            if any(ch.isdigit() for ch in nxt):
-                break
-
-            if 2 <= len(nxt.split()) <= 12:
-                title_lines.append(nxt)
-                last_idx = j
-            else:
-                break
+@st.cache_resource
+def get_extract_cache() -> ExtractCache:
+    """
+    Cache ekstraksi per proses (memori) + folder bersama di disk.
+    Lokasi dan ukuran bisa diatur lewat secrets:
+    extract_cache_dir, extract_cache_max_mb.
+    """
+    return ExtractCache(
+        st.secrets.get("extract_cache_dir", ".cache/extract"),
+        max_bytes=int(st.secrets.get("extract_cache_max_mb", 64)) * 1024 * 1024,
+        namespace="v6",
+    )
 
-        return " ".join(title_lines), last_idx
 
-    for i, line in enumerate(lines):
-        clean = line.strip()
-        if clean:
-            return clean, i
-    return "", -1
+@st.cache_resource
+def get_rule_profiles() -> ProfileRegistry:
+    """
+    Profil aturan format per template jurnal (lihat analysis/profiles.py).
+    File diatur lewat secrets rules_path (default analysis/profiles.toml)
+    dan di-reload otomatis kalau berubah, tanpa restart app.
+    """
+    return ProfileRegistry(st.secrets.get("rules_path", DEFAULT_RULES_PATH))
 
 
-def extract_author(lines, start_idx):
-    if start_idx < 0:
-        search_start = 0
-    else:
-        search_start = start_idx + 1
+@st.cache_resource
+def get_paper_index() -> PaperIndex:
+    """
+    Hasil ekstraksi per hash isi PDF (lihat paper_index.py); review yang
+    sudah ada dicari di review store lewat kolom content_hash. Lokasi
+    lewat secrets paper_index_path.
+    """
+    return PaperIndex(st.secrets.get("paper_index_path", ".data/papers.db"))
+
+
+@st.cache_resource
+def get_extract_pool() -> ExtractPool:
+    """
+    Pool parsing PDF bersama semua session (lihat extract_pool.py).
+    Secrets: extract_workers (default jumlah core), extract_queue,
+    extract_timeout (detik per PDF), pdf_spill_mb (upload lebih besar
+    dibaca dari file sementara), upload_budget_session_mb dan
+    upload_budget_total_mb (batas ukuran upload yang sedang dianalisis).
+    """
+    mb = 1024 * 1024
+    return ExtractPool(
+        workers=st.secrets.get("extract_workers"),
+        max_queue=int(st.secrets.get("extract_queue", 16)),
+        timeout=float(st.secrets.get("extract_timeout", 120)),
+        spill_bytes=int(float(st.secrets.get("pdf_spill_mb", 16)) * mb),
+        budget=MemoryBudget(
+            per_session=int(
+                float(st.secrets.get("upload_budget_session_mb", 200)) * mb
+            ),
+            total=int(float(st.secrets.get("upload_budget_total_mb", 1024)) * mb),
+        ),
+    )
+
+
+def analyze_upload(pdf_data, max_pages=None, profile=None,
+                   paper_hash=None) -> dict:
+    """
+    Hasil analisis PDF: dari cache atau paper index kalau ada, kalau
+    tidak lewat pool worker. Selama menunggu, status antrian/proses
+    ditampilkan.
+
+    `pdf_data` sebaiknya memoryview dari `UploadedFile.getbuffer()`
+    supaya isi upload tidak pernah disalin; `paper_hash` (content_hash
+    yang sudah dihitung) menghindari hash ulang. `profile` (RuleProfile)
+    ikut menentukan key cache: PDF yang sama dengan profil lain, atau
+    setelah profilnya diedit, dianalisis ulang. `max_pages` juga bagian
+    dari key, karena hasil dengan batas halaman berbeda bisa berbeda.
+    """
+    profile = profile or DEFAULT_PROFILE
+    if paper_hash is None:
+        with recorder.stage("upload.hash"):
+            paper_hash = content_hash(pdf_data)
+    rules_key = f"{profile.key}-p{max_pages or 'all'}"
+    digest = f"{paper_hash}-{rules_key}"
+    cache = get_extract_cache()
+    result = cache.get(digest)
+    if result is not None:
+        recorder.count("extract_cache.hit")
+        return result
+    index = get_paper_index()
+    result = index.result(paper_hash, rules_key)
+    if result is not None:
+        recorder.count("paper_index.result_hit")
+        cache.put(digest, result)
+        return result
+    recorder.count("extract_cache.miss")
+    started = time.perf_counter()
+
+    pool = get_extract_pool()
+    try:
+        job = pool.submit(
+            digest, pdf_data, max_pages,
+            owner=st.session_state.setdefault("session_id", uuid4().hex),
+            profile=profile,
+        )
+    except QueueFull:
+        st.warning(
+            "⏳ The PDF checker is busy with other uploads. "
+            "Please try again in a minute."
+        )
+        st.stop()
+    except BudgetExceeded as e:
+        st.warning(f"⏳ {e}")
+        st.stop()
+
+    status = st.empty()
+    while not job.wait(0.5):
+        position = pool.position(job)
+        if position:
+            status.info(f"⏳ Queued for analysis (position {position})…")
+        else:
+            status.info(f"⚙️ Analyzing PDF… {job.elapsed():.0f}s")
+    status.empty()
+
+    recorder.record("upload.analyze", time.perf_counter() - started)
+
+    try:
+        result = job.result()
+    except Exception as e:
+        st.error(f"❌ Could not analyze this PDF: {e}")
+        st.stop()
+    cache.put(digest, result)
+    index.put_result(paper_hash, rules_key, result)
+    return result
+
+
+def show_previous_reviews(reviews: list, current_user: str):
+    """
+    Tampilkan review yang sudah ada untuk paper yang sama (isi file sama).
+    Isi review hanya untuk review milik user sendiri; dari reviewer lain
+    cukup waktu dan status format.
+    """
+    own = [r for r in reviews if r.get("reviewer_user") == current_user]
+    others = [r for r in reviews if r.get("reviewer_user") != current_user]
+    names = sorted({r["file_name"] for r in own if r.get("file_name")})
+    st.warning(
+        f"⚠️ This paper was already reviewed {len(reviews)} time(s)"
+        + (f", uploaded by you as {', '.join(names)}." if names else ".")
+    )
+    if own:
+        df_prev = pd.DataFrame(own)
+        st.dataframe(
+            df_prev[
+                [
+                    "timestamp",
+                    "reviewer_user",
+                    "file_name",
+                    "title",
+                    "status",
+                    "overall_eval",
+                    "recommendations",
+                ]
+            ],
+            use_container_width=True,
+        )
+        with st.expander("Full review details"):
+            st.dataframe(df_prev.set_index("timestamp").T, use_container_width=True)
+    if others:
+        st.caption(f"{len(others)} review(s) by other reviewers:")
+        st.dataframe(
+            pd.DataFrame(others)[["timestamp", "status"]],
+            use_container_width=True,
+        )
+
 
-    for line in lines[search_start : search_start + 10]:
-        clean = line.strip()
-        if not clean:
-            continue
+# ============================================================
+# FORM REVIEW (fragment: widget di dalamnya hanya me-rerun form ini)
+# ============================================================
 
-        words = clean.split()
-        if not (2 <= len(words) <= 25):
-            continue
 
-        cap_words = [w for w in words if w[0].isupper()]
-        if len(cap_words) < 2:
-            continue
+@st.fragment
+def review_form(detected: dict, file_key: str, paper_hash: str):
+    """
+    Form evaluasi untuk satu PDF. Karena berupa fragment, menjawab
+    pertanyaan / mengetik komentar hanya me-rerun fungsi ini, tanpa
+    parsing PDF ulang dan tanpa memuat ulang summary review. Review yang
+    tersimpan juga dicatat di paper index dengan `paper_hash`.
+    """
+    with st.expander(f"📄 Review: {detected['file_name']}"):
+        advisor = st.text_input("Advisor:", key=f"{file_key}_advisor")
+        reviewed_by = st.text_input(
+            "Reviewer name:", key=f"{file_key}_reviewer"
+        )
 
-        if (
-            "," in clean
-            or ";" in clean
-            or " and " in clean.lower()
-            or "." in clean
-        ):
-            return clean
+        def radio_with_comment(question, key_prefix):
+            val = st.radio(
+                question,
+                ["Yes", "No"],
+                index=None,
+                key=f"{file_key}_{key_prefix}_val",
+            )
+            comment = ""
+            if val == "No":
+                comment = st.text_area(
+                    f"{question} - Comments:",
+                    key=f"{file_key}_{key_prefix}_comment",
+                )
+            return val, comment
 
-    return ""
+        english_ok, english_issue = radio_with_comment(
+            "Is the manuscript written in proper and sound English?",
+            "english",
+        )
+        format_ok, format_comment = radio_with_comment(
+            "Format follows author guideline?", "format"
+        )
+        sota_ok = st.radio(
+            "Is the problem state-of-the-art?",
+            ["Yes", "No"],
+            index=None,
+            key=f"{file_key}_sota",
+        )
+        clarity_ok = st.radio(
+            "Is the problem clearly stated?",
+            ["Yes", "No"],
+            index=None,
+            key=f"{file_key}_clarity",
+        )
+        figures_ok, figures_comment = radio_with_comment(
+            "Do figures/tables support the goal/result?", "figures"
+        )
+        conclusion_ok, conclusion_comment = radio_with_comment(
+            "Does the conclusion answer the problem?", "conclusion"
+        )
+        references_ok, references_comment = radio_with_comment(
+            "Are references up-to-date?", "references"
+        )
+
+        recommendations = st.text_area(
+            "Recommendations:", key=f"{file_key}_recommend"
+        )
+        overall_eval = st.selectbox(
+            "Overall Evaluation",
+            ["", "Reject", "Accept with revision", "Full acceptance"],
+            key=f"{file_key}_overall_eval",
+        )
+
+        if st.button("Submit Review", key=f"{file_key}_submit"):
+            errors = []
+
+            if not advisor.strip():
+                errors.append("• Advisor is required.")
+            if not reviewed_by.strip():
+                errors.append("• Reviewer name is required.")
+            if overall_eval.strip() == "":
+                errors.append("• Overall Evaluation is required.")
+
+            if (
+                english_ok is None
+                or format_ok is None
+                or sota_ok is None
+                or clarity_ok is None
+                or figures_ok is None
+                or conclusion_ok is None
+                or references_ok is None
+            ):
+                errors.append("• Please answer all Yes/No questions.")
+
+            if errors:
+                st.warning(
+                    "Please complete the following before submitting:\n"
+                    + "\n".join(errors)
+                )
+            else:
+                summary = {
+                    **detected,
+                    "advisor": advisor,
+                    "reviewed_by": reviewed_by,
+                    "english_ok": english_ok,
+                    "english_issue": english_issue,
+                    "format_ok": format_ok,
+                    "format_comment": format_comment,
+                    "sota_ok": sota_ok,
+                    "clarity_ok": clarity_ok,
+                    "figures_ok": figures_ok,
+                    "figures_comment": figures_comment,
+                    "conclusion_ok": conclusion_ok,
+                    "conclusion_comment": conclusion_comment,
+                    "references_ok": references_ok,
+                    "references_comment": references_comment,
+                    "recommendations": recommendations,
+                    "overall_eval": overall_eval,
+                    "timestamp": datetime.now().strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    ),
+                    "content_hash": paper_hash,
+                }
+                if save_review_to_sheet(summary):
+                    store = get_review_store()
+                    messages = []
+                    total_rows = store.count()
+                    if total_rows is not None:
+                        messages.append(f"Total reviews saved: {total_rows}")
+                    pending = store.pending_sync()
+                    if pending:
+                        messages.append(
+                            f"{pending} review(s) queued for Google Sheets; "
+                            "they are sent in the background."
+                        )
+                    st.session_state[f"{file_key}_saved"] = messages
+                    st.session_state[f"{file_key}_submitted"] = True
+                    # Rerun penuh supaya summary di bawah ikut memuat review baru.
+                    st.rerun()
+
+        saved = st.session_state.pop(f"{file_key}_saved", None)
+        if saved is not None:
+            for message in saved:
+                st.info(message)
+            st.success("✅ Review submitted & saved.")
 
 
 # ============================================================
@@ -369,54 +616,103 @@ def extract_author(lines, start_idx):
 # ============================================================
 
 if current_role == "Reviewer":
+    # Worker langsung start (dan me-load PyMuPDF) sebelum upload pertama.
+    get_extract_pool()
+
     st.markdown(
         "<h4 style='color:#f39c12;'>📁 Upload PDF File</h4>", unsafe_allow_html=True
     )
+    # Satu snapshot per run: reload file di tengah render tidak boleh
+    # menghapus profil di antara names() dan get().
+    profiles = get_rule_profiles().snapshot()
+    profile_names = profiles.names()
+    profile_name = st.selectbox(
+        "Paper template",
+        profile_names,
+        index=profile_names.index(profiles.default),
+        format_func=lambda name: profiles.get(name).label,
+        key="rule_profile",
+    )
+    if profiles.error:
+        st.caption(
+            f"⚠️ Rule file has errors, using the last valid rules: {profiles.error}"
+        )
     pdf_file = st.file_uploader("Upload a PDF", type="pdf")
 
+    review_paper = bool(pdf_file)
     if pdf_file:
-        file_key = (
-            f"{current_user}_" + pdf_file.name.replace(".", "_").replace(" ", "_")
-        )
-
-        text = ""
-        with fitz.open(stream=pdf_file.read(), filetype="pdf") as doc:
-            for page in doc:
-                text += page.get_text()
-
-        lines = text.split("\n") if text else []
+        pdf_data = pdf_file.getbuffer()
+        # Hash dihitung sekali per upload, bukan di tiap rerun.
+        cached_hash = st.session_state.get("upload_hash")
+        if cached_hash and cached_hash[0] == pdf_file.file_id:
+            paper_hash = cached_hash[1]
+        else:
+            with recorder.stage("upload.hash"):
+                paper_hash = content_hash(pdf_data)
+            st.session_state["upload_hash"] = (pdf_file.file_id, paper_hash)
+        # Key form per isi file, bukan nama file: paper yang sama dengan
+        # nama lain tetap paper yang sama.
+        file_key = f"{current_user}_{paper_hash[:16]}"
+
+        # Paper yang sudah pernah direview (di luar submit session ini):
+        # tampilkan review yang ada, tanpa parsing, kecuali reviewer memang
+        # ingin mereview ulang.
+        try:
+            with recorder.stage("paper_index.lookup"):
+                header, rows = get_review_store().load_for_paper(paper_hash)
+            previous = [dict(zip(header, row)) for row in rows]
+        except Exception as e:
+            st.caption(f"⚠️ Could not check for earlier reviews of this paper: {e}")
+            previous = []
+        if previous and not st.session_state.get(f"{file_key}_submitted"):
+            recorder.count("paper_index.duplicate")
+            show_previous_reviews(previous, current_user)
+            review_paper = st.checkbox(
+                "Review this paper again anyway", key=f"{file_key}_again"
+            )
 
-        title, title_last_idx = extract_title(lines)
-        student_author_line = extract_author(lines, title_last_idx)
+    if review_paper:
+        # Default tanpa batas: section di halaman akhir tetap dicek.
+        max_pages = st.secrets.get("pdf_max_pages")
+        profile = profiles.get(profile_name)
+        result = analyze_upload(
+            pdf_data, max_pages=max_pages, profile=profile, paper_hash=paper_hash
+        )
 
         detected = {
             "file_name": pdf_file.name,
-            "title": title,
-            "student_author": student_author_line,
+            "title": result["title"],
+            "student_author": result["student_author"],
             "reviewer_user": current_user,
             "reviewer_role": current_role,
         }
 
         for heading in HEADINGS:
-            detected[heading.capitalize()] = detect_heading_presence(text, heading)
-
-        missing_sections = [
-            h for h in HEADINGS if detected[h.capitalize()] == 0
-        ]
-        all_ok = len(missing_sections) == 0
-        detected["status"] = (
-            "✅ Compliant" if all_ok else "❌ Non-compliant"
-        )
+            detected[heading.capitalize()] = result[heading.capitalize()]
 
-        if all_ok:
-            st.success(
-                "✅ All required sections are present. Format is COMPLIANT."
-            )
-        else:
+        missing_sections = result["missing_sections"]
+        unchecked_sections = result.get("unchecked_sections", [])
+        detected["status"] = result["status"]
+
+        if missing_sections:
             st.warning(
                 "❌ Format is NOT compliant. Missing sections: "
                 + ", ".join(s.title() for s in missing_sections)
             )
+        elif unchecked_sections:
+            st.warning(
+                "⚠️ Format only partially checked. Not checked: "
+                + ", ".join(s.title() for s in unchecked_sections)
+            )
+        else:
+            st.success(
+                "✅ All required sections are present. Format is COMPLIANT."
+            )
+        if result.get("truncated"):
+            st.info(
+                f"ℹ️ Checked {result['pages_read']} of {result['page_count']} "
+                "pages (pdf_max_pages); sections after that were not checked."
+            )
 
         st.markdown(
             "<h5 style='color:#2c3e50;'>🔹 Format Features</h5>",
@@ -424,6 +720,7 @@ if current_role == "Reviewer":
         )
         df_format = pd.DataFrame([detected])
         st.dataframe(df_format, use_container_width=True)
+        st.caption(f"Checked with {profile.label} rules (version {profile.version}).")
 
         st.markdown("---")
 
@@ -432,218 +729,282 @@ if current_role == "Reviewer":
             unsafe_allow_html=True,
         )
 
-        with st.expander(f"📄 Review: {detected['file_name']}"):
-            advisor = st.text_input("Advisor:", key=f"{file_key}_advisor")
-            reviewed_by = st.text_input(
-                "Reviewer name:", key=f"{file_key}_reviewer"
-            )
+        review_form(detected, file_key, paper_hash)
 
-            def radio_with_comment(question, key_prefix):
-                val = st.radio(
-                    question,
-                    ["Yes", "No"],
-                    index=None,
-                    key=f"{file_key}_{key_prefix}_val",
-                )
-                comment = ""
-                if val == "No":
-                    comment = st.text_area(
-                        f"{question} - Comments:",
-                        key=f"{file_key}_{key_prefix}_comment",
-                    )
-                return val, comment
+elif current_role == "Admin":
+    st.info(
+        "You are logged in as Admin. Admin can view and download all reviews but cannot upload new papers or submit reviews."
+    )
 
-            english_ok, english_issue = radio_with_comment(
-                "Is the manuscript written in proper and sound English?",
-                "english",
-            )
-            format_ok, format_comment = radio_with_comment(
-                "Format follows author guideline?", "format"
-            )
-            sota_ok = st.radio(
-                "Is the problem state-of-the-art?",
-                ["Yes", "No"],
-                index=None,
-                key=f"{file_key}_sota",
-            )
-            clarity_ok = st.radio(
-                "Is the problem clearly stated?",
-                ["Yes", "No"],
-                index=None,
-                key=f"{file_key}_clarity",
-            )
-            figures_ok, figures_comment = radio_with_comment(
-                "Do figures/tables support the goal/result?", "figures"
-            )
-            conclusion_ok, conclusion_comment = radio_with_comment(
-                "Does the conclusion answer the problem?", "conclusion"
-            )
-            references_ok, references_comment = radio_with_comment(
-                "Are references up-to-date?", "references"
-            )
+    store = get_review_store()
+    if not store.seeded():
+        st.warning(
+            "⚠️ Existing reviews from Google Sheets have not been imported "
+            "into the local database yet; summaries and statistics may be "
+            "incomplete. Import is retried automatically."
+            + (f" Last error: {store.seed_error}" if store.seed_error else "")
+        )
+        if st.button("🔁 Retry import from Google Sheets now"):
+            store.retry_seed(force=True)
+            st.rerun()
 
-            recommendations = st.text_area(
-                "Recommendations:", key=f"{file_key}_recommend"
+    with st.expander("📈 Google Sheets quota usage"):
+        pool_stats = get_pool().stats()
+        quota = pool_stats["rate_limit"]
+        st.caption(
+            f"Limit {quota['per_minute']:.0f} requests/min, "
+            f"{quota['tokens']:.1f} tokens available, "
+            f"{quota['waiting']} caller(s) waiting."
+        )
+        age = pool_stats["connection_age_s"]
+        st.caption(
+            f"Worksheet cache: {pool_stats['hits']} hits, "
+            f"{pool_stats['misses']} misses. "
+            f"Reconnects: {pool_stats['reconnects']}. "
+            + (
+                f"Connected for {age / 60:.0f} min."
+                if age is not None
+                else "Not connected yet."
             )
-            overall_eval = st.selectbox(
-                "Overall Evaluation",
-                ["", "Reject", "Accept with revision", "Full acceptance"],
-                key=f"{file_key}_overall_eval",
+        )
+        if quota["endpoints"]:
+            st.dataframe(
+                pd.DataFrame(
+                    [
+                        {
+                            "endpoint": name,
+                            "calls": ep["calls"],
+                            "wait_total_s": ep["wait_total_s"],
+                            **ep["wait_hist"],
+                        }
+                        for name, ep in quota["endpoints"].items()
+                    ]
+                ).set_index("endpoint"),
+                use_container_width=True,
             )
 
-            if st.button("Submit Review", key=f"{file_key}_submit"):
-                errors = []
-
-                if not advisor.strip():
-                    errors.append("• Advisor is required.")
-                if not reviewed_by.strip():
-                    errors.append("• Reviewer name is required.")
-                if overall_eval.strip() == "":
-                    errors.append("• Overall Evaluation is required.")
-
-                if (
-                    english_ok is None
-                    or format_ok is None
-                    or sota_ok is None
-                    or clarity_ok is None
-                    or figures_ok is None
-                    or conclusion_ok is None
-                    or references_ok is None
-                ):
-                    errors.append("• Please answer all Yes/No questions.")
-
-                if errors:
-                    st.warning(
-                        "Please complete the following before submitting:\n"
-                        + "\n".join(errors)
-                    )
-                else:
-                    summary = {
-                        **detected,
-                        "advisor": advisor,
-                        "reviewed_by": reviewed_by,
-                        "english_ok": english_ok,
-                        "english_issue": english_issue,
-                        "format_ok": format_ok,
-                        "format_comment": format_comment,
-                        "sota_ok": sota_ok,
-                        "clarity_ok": clarity_ok,
-                        "figures_ok": figures_ok,
-                        "figures_comment": figures_comment,
-                        "conclusion_ok": conclusion_ok,
-                        "conclusion_comment": conclusion_comment,
-                        "references_ok": references_ok,
-                        "references_comment": references_comment,
-                        "recommendations": recommendations,
-                        "overall_eval": overall_eval,
-                        "timestamp": datetime.now().strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        ),
+    with st.expander("📐 Rule profiles"):
+        profiles = get_rule_profiles().snapshot()
+        st.caption(
+            f"Loaded from `{profiles.path}` (default: {profiles.default}); "
+            "edits are picked up automatically."
+        )
+        if profiles.error:
+            st.warning(f"Last reload failed, previous rules kept: {profiles.error}")
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "profile": name,
+                        "label": profiles.get(name).label,
+                        "version": profiles.get(name).version,
+                        "key": profiles.get(name).key,
                     }
-                    save_review_to_sheet(summary)
-                    try:
-                        ws_debug = get_worksheet()
-                        total_rows = max(
-                            len(ws_debug.get_all_values()) - 1, 0
-                        )
-                        st.info(
-                            f"Total reviews saved in Google Sheets: {total_rows}"
-                        )
-                    except Exception as e:
-                        st.warning(
-                            f"Could not read back from Google Sheet: {e}"
-                        )
-                    st.success(
-                        "✅ Review submitted & saved to central Google Sheet."
-                    )
+                    for name in profiles.names()
+                ]
+            ).set_index("profile"),
+            use_container_width=True,
+        )
 
-elif current_role == "Admin":
-    st.info(
-        "You are logged in as Admin. Admin can view and download all reviews but cannot upload new papers or submit reviews."
-    )
+    with st.expander("⏱️ Performance (this server process)"):
+        # Rolling p50/p95 per tahap dari perf.recorder (lihat perf.py).
+        stages = recorder.summary()
+        if stages:
+            st.dataframe(
+                pd.DataFrame.from_dict(stages, orient="index"),
+                use_container_width=True,
+            )
+        else:
+            st.caption("No measurements yet.")
+        perf_stats = recorder.stats()
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "count": pd.Series(perf_stats["counters"], dtype="int64"),
+                    "bytes": pd.Series(perf_stats["bytes"], dtype="int64"),
+                }
+            ),
+            use_container_width=True,
+        )
+        cache_stats = get_extract_cache().stats()
+        st.caption(
+            f"Extract cache: {cache_stats['memory_entries']} entries in memory, "
+            f"{cache_stats['memory_hits']} memory hits, "
+            f"{cache_stats['disk_hits']} disk hits, "
+            f"{cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%} hit rate), "
+            f"{cache_stats['evictions']} evictions."
+        )
+
+    with st.expander("📊 Review statistics"):
+        # Dibaca dari agregat yang di-update tiap review (review_stats.py),
+        # bukan dari seluruh riwayat review.
+        store = get_review_store()
+        counts = store.stats()
+        tables = as_tables(counts)
+        st.metric("Total reviews", counts.get((TOTAL, "all"), 0))
+        indexed = get_paper_index().stats()
+        st.caption(
+            f"Paper index: {indexed['results']} stored extraction result(s) "
+            f"for {indexed['papers']} distinct paper(s) by content hash."
+        )
+        for column, name in zip(st.columns(len(GROUP_COLUMNS)), GROUP_COLUMNS):
+            column.markdown(f"**{name}**")
+            column.dataframe(
+                pd.Series(tables.get(name, {}), name="count", dtype="int64")
+                .sort_values(ascending=False),
+                use_container_width=True,
+            )
+        st.markdown("**Missing section rate**")
+        st.dataframe(
+            pd.Series(missing_rates(counts), name="missing").map("{:.0%}".format),
+            use_container_width=True,
+        )
+        if st.button("♻️ Rebuild statistics from all reviews"):
+            store.rebuild_stats()
+            st.rerun()
 
 # ============================================================
-# FINAL REVIEW SUMMARY (dari Google Sheets)
+# FINAL REVIEW SUMMARY (dari review store)
 # ============================================================
 
-df_all = load_reviews_from_sheet()
-
-if not df_all.empty:
-    st.markdown("### 🚀 Final Review Summary (All Sessions)")
-
-    df_all.insert(0, "No", range(1, len(df_all) + 1))
 
+@st.fragment
+def review_summary(current_user: str, current_role: str):
+    """
+    Tabel summary review. Sebagai fragment, ganti periode atau klik retry
+    hanya me-rerun bagian ini; widget di form review tidak menyentuhnya.
+    """
+    selected_periods = None
     if current_role == "Admin":
-        df_view = df_all.copy()
-    else:
-        df_view = df_all[df_all["reviewer_user"] == current_user].copy()
-
-    if df_view.empty:
-        st.info("No reviews recorded yet for this user.")
+        periods = get_review_store().periods()
+        if periods:
+            # Default semua periode, supaya tombol "Download All" memang
+            # berisi semua review.
+            options = ["All periods"] + periods[::-1]
+            choice = st.selectbox("Review period", options, index=0)
+            if choice != "All periods":
+                selected_periods = [choice]
+        df_all = load_reviews_from_sheet(periods=selected_periods)
     else:
-        st.markdown("#### 🔹 Format Features")
-        format_cols = [
-            "No",
-            "file_name",
-            "title",
-            "status",
-            "reviewer_user",
-            "reviewer_role",
-            "Introduction",
-            "Materials and methods",
-            "Results and discussion",
-            "Conclusion",
-            "References",
-        ]
-        st.dataframe(
-            df_view[format_cols].set_index("No"), use_container_width=True
-        )
+        # Reviewer hanya butuh review miliknya sendiri.
+        df_all = load_reviews_from_sheet(reviewer_user=current_user)
+
+    if not df_all.empty:
+        st.markdown("### 🚀 Final Review Summary (All Sessions)")
+
+        store = get_review_store()
+        age = store.age()
+        if age is not None:
+            st.caption(f"Data synced from Google Sheets {age:.0f}s ago.")
+        pending = store.pending_sync()
+        if pending:
+            st.caption(f"{pending} review(s) waiting to be copied to Google Sheets.")
+        failed = store.failed_sync()
+        if failed and current_role == "Admin":
+            st.warning(
+                f"{failed} review(s) could not be written to Google Sheets "
+                "after repeated retries."
+            )
+            if st.button("🔁 Retry failed Google Sheets writes"):
+                store.outbox.requeue_dead()
+                st.rerun()
 
-        st.markdown("#### 🔴 Reviewer Evaluation")
-        subjective_cols = [
-            "No",
-            "file_name",
-            "title",
-            "student_author",
-            "advisor",
-            "reviewed_by",
-            "reviewer_user",
-            "reviewer_role",
-            "english_ok",
-            "format_ok",
-            "sota_ok",
-            "clarity_ok",
-            "figures_ok",
-            "conclusion_ok",
-            "references_ok",
-            "recommendations",
-            "overall_eval",
-            "timestamp",
-        ]
-        st.dataframe(
-            df_view[subjective_cols].set_index("No"),
-            use_container_width=True,
-        )
+        df_all.insert(0, "No", range(1, len(df_all) + 1))
 
         if current_role == "Admin":
-            csv = df_all.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                "💾 Download All Review Summary as CSV (Admin only)",
-                csv,
-                "review_summary.csv",
-                "text/csv",
+            df_view = df_all.copy()
+        else:
+            df_view = df_all[df_all["reviewer_user"] == current_user].copy()
+
+        if df_view.empty:
+            st.info("No reviews recorded yet for this user.")
+        else:
+            st.markdown("#### 🔹 Format Features")
+            format_cols = [
+                "No",
+                "file_name",
+                "title",
+                "status",
+                "reviewer_user",
+                "reviewer_role",
+                "Introduction",
+                "Materials and methods",
+                "Results and discussion",
+                "Conclusion",
+                "References",
+            ]
+            st.dataframe(
+                df_view[format_cols].set_index("No"), use_container_width=True
             )
 
-    html(
+            st.markdown("#### 🔴 Reviewer Evaluation")
+            subjective_cols = [
+                "No",
+                "file_name",
+                "title",
+                "student_author",
+                "advisor",
+                "reviewed_by",
+                "reviewer_user",
+                "reviewer_role",
+                "english_ok",
+                "format_ok",
+                "sota_ok",
+                "clarity_ok",
+                "figures_ok",
+                "conclusion_ok",
+                "references_ok",
+                "recommendations",
+                "overall_eval",
+                "timestamp",
+            ]
+            st.dataframe(
+                df_view[subjective_cols].set_index("No"),
+                use_container_width=True,
+            )
+
+            if current_role == "Admin":
+                data_version = store.version()
+                if data_version is not None:
+                    data_version = (data_version, tuple(selected_periods or ()))
+                if selected_periods:
+                    scope = f"{selected_periods[0]} Review Summary"
+                    file_stem = f"review_summary_{selected_periods[0]}"
+                else:
+                    scope = "All Review Summary"
+                    file_stem = "review_summary"
+                st.download_button(
+                    f"💾 Download {scope} as CSV (Admin only)",
+                    lambda: export_reviews("csv", df_all, data_version),
+                    f"{file_stem}.csv",
+                    "text/csv",
+                    on_click="ignore",
+                )
+                if find_spec("pyarrow") is not None:
+                    st.download_button(
+                        f"💾 Download {scope} as Parquet (Admin only)",
+                        lambda: export_reviews("parquet", df_all, data_version),
+                        f"{file_stem}.parquet",
+                        "application/vnd.apache.parquet",
+                        on_click="ignore",
+                    )
+
+        html(
+            """
+        <script>
+        window.addEventListener('beforeunload', function (e) {
+            var confirmationMessage = 'Reloading this page will not delete saved reviews (they are in Google Sheets), but unsaved form data will be lost. Continue?';
+            (e || window.event).returnValue = confirmationMessage;
+            return confirmationMessage;
+        });
+        </script>
         """
-    <script>
-    window.addEventListener('beforeunload', function (e) {
-        var confirmationMessage = 'Reloading this page will not delete saved reviews (they are in Google Sheets), but unsaved form data will be lost. Continue?';
-        (e || window.event).returnValue = confirmationMessage;
-        return confirmationMessage;
-    });
-    </script>
-    """
-    )
-else:
-    st.info("No reviews recorded yet.")
+        )
+    elif current_role == "Admin":
+        st.info("No reviews recorded yet.")
+    else:
+        st.info("No reviews recorded yet for this user.")
+
+
+review_summary(current_user, current_role)
@@ -0,0 +1,333 @@
+"""
+Cek format banyak PDF sekaligus tanpa Streamlit.
+
+    python batch_check.py papers/            -o intake.csv
+    python batch_check.py intake_2025.zip    -o intake_parquet --format parquet
+    python batch_check.py papers/ -o ieee.csv --profile ieee
+
+Input boleh folder (dicari rekursif) atau file .zip. Hasil ditulis
+bertahap dengan layout `COLUMNS` yang sama dengan Google Sheet. Progress
+disimpan di file checkpoint, jadi kalau proses mati cukup jalankan ulang
+perintah yang sama untuk melanjutkan.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+from analysis import COLUMNS, HEADINGS, ProfileRegistry, analyze, content_hash
+from analysis.profiles import DEFAULT_PATH as DEFAULT_RULES_PATH
+
+BATCH_USER = "batch"
+BATCH_ROLE = "Batch"
+
+
+def list_pdfs(source: str) -> list:
+    """Nama PDF dalam folder (path relatif) atau zip, urut alfabet."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            names = [
+                n for n in zf.namelist()
+                if n.lower().endswith(".pdf") and not n.endswith("/")
+            ]
+        return sorted(names)
+
+    names = []
+    for root, _, files in os.walk(source):
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                names.append(os.path.relpath(os.path.join(root, name), source))
+    return sorted(names)
+
+
+def _read_pdf(source: str, name: str) -> bytes:
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            return zf.read(name)
+    with open(os.path.join(source, name), "rb") as f:
+        return f.read()
+
+
+def check_one(source: str, name: str, max_pages=None, profile=None) -> dict:
+    """Analisis satu PDF dan kembalikan satu baris dengan key `COLUMNS`."""
+    row = {col: "" for col in COLUMNS}
+    row.update(
+        {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "reviewer_user": BATCH_USER,
+            "reviewer_role": BATCH_ROLE,
+            "file_name": name,
+        }
+    )
+    try:
+        pdf = _read_pdf(source, name)
+        row["content_hash"] = content_hash(pdf)
+        result = analyze(pdf, max_pages=max_pages, profile=profile)
+    except Exception as e:
+        row["status"] = f"⚠️ Error: {e}"
+        return row
+
+    row["title"] = result["title"]
+    row["student_author"] = result["student_author"]
+    row["status"] = result["status"]
+    if result["truncated"]:
+        row["format_comment"] = (
+            f"Checked {result['pages_read']} of {result['page_count']} pages; "
+            "not checked: "
+            + ", ".join(h.capitalize() for h in result["unchecked_sections"])
+        )
+    for heading in HEADINGS:
+        row[heading.capitalize()] = result[heading.capitalize()]
+    return row
+
+
+def _truncate_torn_tail(path):
+    """
+    Buang baris terakhir yang terpotong (proses mati di tengah write),
+    supaya baris berikutnya tidak tersambung ke sisa baris itu.
+    """
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+class CsvSink:
+    def __init__(self, path):
+        resume = os.path.exists(path) and os.path.getsize(path) > 0
+        fieldnames = COLUMNS
+        self.written = set()
+        if resume:
+            _truncate_torn_tail(path)
+            # Lanjutkan dengan header file yang sudah ada (bisa dari versi
+            # dengan kolom lebih sedikit), supaya kolomnya tetap sejajar.
+            with open(path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                fieldnames = next(reader, None) or COLUMNS
+                if "file_name" in fieldnames:
+                    i = fieldnames.index("file_name")
+                    self.written = {r[i] for r in reader if len(r) > i}
+            resume = os.path.getsize(path) > 0
+        self._f = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(
+            self._f, fieldnames=fieldnames, extrasaction="ignore"
+        )
+        if not resume:
+            self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        self._f.close()
+
+
+class ParquetSink:
+    """
+    Tulis tiap batch sebagai file part-NNNNN.parquet di satu folder;
+    folder itu bisa dibaca langsung dengan `pd.read_parquet(folder)`.
+    """
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Parquet output needs pyarrow: pip install pyarrow")
+        self._pa = pa
+        self._pq = pq
+        self._path = path
+        os.makedirs(path, exist_ok=True)
+        parts = [n for n in os.listdir(path) if n.endswith(".parquet")]
+        self._part = len(parts)
+        self.written = set()
+        for name in parts:
+            table = pq.read_table(
+                os.path.join(path, name), columns=["file_name"]
+            )
+            self.written.update(table.column("file_name").to_pylist())
+
+    def write(self, rows):
+        if not rows:
+            return
+        table = self._pa.table(
+            {col: [str(row[col]) for row in rows] for col in COLUMNS}
+        )
+        target = os.path.join(self._path, f"part-{self._part:05d}.parquet")
+        self._pq.write_table(table, target + ".tmp")
+        os.replace(target + ".tmp", target)
+        self._part += 1
+
+    def close(self):
+        pass
+
+
+class Checkpoint:
+    """
+    File JSON lines berisi nama PDF yang hasilnya sudah tertulis. Baris
+    terakhir yang terpotong karena proses mati saat `mark` dibuang.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            _truncate_torn_tail(path)
+            with open(path, encoding="utf-8") as f:
+                for n, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self.done.add(json.loads(line))
+                    except ValueError as e:
+                        raise ValueError(
+                            f"{path}:{n}: corrupt checkpoint line: {e}"
+                        ) from None
+        self._f = open(path, "a", encoding="utf-8")
+
+    def mark(self, names):
+        for name in names:
+            self._f.write(json.dumps(name) + "\n")
+            self.done.add(name)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        self._f.close()
+
+
+def run(source, output, fmt="csv", workers=None, batch_size=50,
+        checkpoint=None, max_pages=None, profile=None, log=sys.stderr) -> dict:
+    names = list_pdfs(source)
+    ckpt = Checkpoint(checkpoint or output.rstrip("/\\") + ".checkpoint")
+    sink = ParquetSink(output) if fmt == "parquet" else CsvSink(output)
+    # Sink ditulis sebelum checkpoint; kalau proses mati di antaranya,
+    # baris yang sudah ada di output tidak dicek (dan ditulis) ulang.
+    done = ckpt.done | sink.written
+    todo = [n for n in names if n not in done]
+
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    processed = 0
+    pending_rows = []
+
+    def flush():
+        sink.write(pending_rows)
+        ckpt.mark([row["file_name"] for row in pending_rows])
+        pending_rows.clear()
+
+    print(
+        f"{len(names)} PDFs found, {len(names) - len(todo)} already done, "
+        f"{len(todo)} to check with {workers} workers",
+        file=log,
+    )
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            queue = iter(todo)
+            in_flight = set()
+            # Batasi jumlah job yang antre supaya memori tetap kecil.
+            for name in queue:
+                in_flight.add(
+                    pool.submit(check_one, source, name, max_pages, profile)
+                )
+                if len(in_flight) >= workers * 4:
+                    break
+
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending_rows.append(future.result())
+                    processed += 1
+                    nxt = next(queue, None)
+                    if nxt is not None:
+                        in_flight.add(
+                            pool.submit(
+                                check_one, source, nxt, max_pages, profile
+                            )
+                        )
+
+                if len(pending_rows) >= batch_size:
+                    flush()
+                    elapsed = time.perf_counter() - started
+                    print(
+                        f"{processed}/{len(todo)} done, "
+                        f"{processed / elapsed:.1f} docs/sec",
+                        file=log,
+                    )
+        flush()
+    finally:
+        sink.close()
+        ckpt.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "found": len(names),
+        "processed": processed,
+        "skipped": len(names) - len(todo),
+        "seconds": round(elapsed, 2),
+        "docs_per_sec": round(processed / elapsed, 2) if elapsed else 0.0,
+    }
+    print(json.dumps(summary), file=log)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Batch format check for a folder or zip of PDFs."
+    )
+    parser.add_argument("source", help="folder or .zip containing PDFs")
+    parser.add_argument("-o", "--output", required=True,
+                        help="CSV file, or folder for --format parquet")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=50,
+                        help="rows per write/checkpoint")
+    parser.add_argument("--checkpoint", default=None,
+                        help="checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--max-pages", type=int, default=None,
+                        help="stop reading each PDF after N pages "
+                             "(default: no limit)")
+    parser.add_argument("--rules", default=DEFAULT_RULES_PATH,
+                        help="rule profiles TOML file")
+    parser.add_argument("--profile", default=None,
+                        help="rule profile name (default: the file's default)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        parser.error(f"{args.source} does not exist")
+    registry = ProfileRegistry(args.rules)
+    if registry.error:
+        parser.error(f"{args.rules}: {registry.error}")
+    try:
+        profile = registry.get(args.profile)
+    except KeyError:
+        parser.error(
+            f"unknown profile {args.profile!r}; "
+            f"available: {', '.join(registry.names())}"
+        )
+
+    run(
+        args.source,
+        args.output,
+        fmt=args.format,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        checkpoint=args.checkpoint,
+        max_pages=args.max_pages,
+        profile=profile,
+    )
+
+
+if __name__ == "__main__":
+    main()
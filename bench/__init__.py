@@ -0,0 +1,5 @@
+"""
+Benchmark dan alat ukur performa. Jalankan dari root repo, mis.
+
+    python -m bench.run --out bench/results/today.json
+"""
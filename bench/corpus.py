@@ -0,0 +1,137 @@
+"""
+Generator korpus PDF sintetis (PyMuPDF) untuk benchmark.
+
+Variasi yang dibuat: jumlah halaman, kepadatan teks per halaman,
+section yang sengaja dihilangkan, dan layout judul/author (dengan header
+jurnal, judul multi-baris, dsb). Seed yang sama -> korpus yang sama.
+"""
+
+import os
+import random
+
+from analysis import HEADINGS
+
+# Kosakata isi paper yang tidak mengandung synonym section mana pun.
+_WORDS = (
+    "patient clinical sample data model surgical analysis device signal "
+    "measurement imaging tissue protocol cohort baseline outcome error "
+    "sensor accuracy treatment parameter trial group mean value sequence "
+    "observed effect proposed system frequency image robot laser scan"
+).split()
+
+_SECTION_TITLES = {
+    "introduction": "1. Introduction",
+    "materials and methods": "2. Materials and Methods",
+    "results and discussion": "3. Results and Discussion",
+    "conclusion": "4. Conclusion",
+    "references": "References",
+}
+
+# Posisi relatif section di dalam dokumen (0 = halaman pertama).
+_SECTION_AT = {
+    "introduction": 0.0,
+    "materials and methods": 0.25,
+    "results and discussion": 0.5,
+    "conclusion": 0.85,
+    "references": 0.9,
+}
+
+LAYOUTS = ["plain", "journal_header", "multiline_title"]
+
+PAGE_COUNTS = [1, 4, 12, 30, 60]
+DENSITIES = [15, 40, 70]  # baris per halaman
+
+
+def _sentence(rng, n_words):
+    words = [rng.choice(_WORDS) for _ in range(n_words)]
+    return " ".join(words).capitalize()
+
+
+def _front_matter(rng, layout):
+    title_words = [rng.choice(_WORDS).capitalize() for _ in range(9)]
+    lines = []
+    if layout == "journal_header":
+        lines += [
+            "Journal of Medical Technology Vol. 12 Issue 3",
+            "Available online at www.example-journal.org",
+            "Received 12 March 2024; accepted 30 May 2024",
+            "",
+        ]
+    if layout == "multiline_title":
+        lines += [
+            " ".join(title_words[:3]),
+            " ".join(title_words[3:6]),
+            " ".join(title_words[6:]),
+        ]
+    else:
+        lines.append(" ".join(title_words))
+    lines += [
+        "",
+        "Andi Pratama, Siti Rahma and Budi Santoso",
+        "Swiss German University, Tangerang, Indonesia",
+        "",
+        "Abstract",
+        _sentence(rng, 25),
+        "",
+    ]
+    return lines
+
+
+def make_pdf(rng, pages, density, missing=(), layout="plain") -> bytes:
+    import fitz  # PyMuPDF
+
+    start_page = {
+        h: min(int(_SECTION_AT[h] * pages), pages - 1)
+        for h in HEADINGS
+        if h not in missing
+    }
+
+    doc = fitz.open()
+    for page_no in range(pages):
+        lines = _front_matter(rng, layout) if page_no == 0 else []
+        for heading in HEADINGS:
+            if start_page.get(heading) == page_no:
+                lines += ["", _SECTION_TITLES[heading]]
+        while len(lines) < density:
+            lines.append(_sentence(rng, rng.randint(6, 14)))
+
+        page = doc.new_page()
+        page.insert_text((50, 50), "\n".join(lines), fontsize=8)
+
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def generate(seed=0, size=30):
+    """
+    Kembalikan list dict {name, pages, density, missing, layout, pdf}.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        pages = PAGE_COUNTS[i % len(PAGE_COUNTS)]
+        density = DENSITIES[(i // len(PAGE_COUNTS)) % len(DENSITIES)]
+        layout = LAYOUTS[i % len(LAYOUTS)]
+        missing = ()
+        if rng.random() < 0.3:
+            missing = tuple(rng.sample(HEADINGS, rng.randint(1, 2)))
+        corpus.append(
+            {
+                "name": f"doc{i:03d}_{pages}p_{density}l_{layout}.pdf",
+                "pages": pages,
+                "density": density,
+                "missing": list(missing),
+                "layout": layout,
+                "pdf": make_pdf(rng, pages, density, missing, layout),
+            }
+        )
+    return corpus
+
+
+def write_corpus(directory, seed=0, size=30):
+    """Tulis korpus ke folder (mis. sebagai input batch_check.py)."""
+    os.makedirs(directory, exist_ok=True)
+    for doc in generate(seed=seed, size=size):
+        with open(os.path.join(directory, doc["name"]), "wb") as f:
+            f.write(doc["pdf"])
@@ -0,0 +1,198 @@
+"""
+Fake worksheet/spreadsheet gspread di memori, dengan latency buatan.
+
+Hanya method yang dipakai app/sheet_utils yang diimplementasi. Setiap
+call tidur `latency` detik ditambah `per_cell` detik per sel yang
+dikirim/diterima, supaya biaya relatif antara baca-semua dan append
+mirip dengan Sheets API sungguhan.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+
+try:
+    from gspread.exceptions import WorksheetNotFound
+except ImportError:  # bench tanpa gspread terpasang
+    class WorksheetNotFound(LookupError):
+        pass
+
+_A1 = re.compile(r"^([A-Z]+)?(\d+)?(?::([A-Z]+)?(\d+)?)?$")
+
+
+def _col_number(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - ord("A") + 1)
+    return n
+
+
+def _parse_range(rng: str):
+    """'A5:AB' -> (row0=4, col0=0, row1=None, col1=28) dalam index 0-based."""
+    rng = rng.split("!")[-1]
+    m = _A1.match(rng)
+    if m is None:
+        raise ValueError(f"Unsupported range: {rng}")
+    c0, r0, c1, r1 = m.groups()
+    return (
+        int(r0) - 1 if r0 else 0,
+        _col_number(c0) - 1 if c0 else 0,
+        int(r1) if r1 else None,
+        _col_number(c1) if c1 else None,
+    )
+
+
+class FakeWorksheet:
+    def __init__(self, title="Sheet1", rows=None, latency=0.0, per_cell=0.0,
+                 spreadsheet=None):
+        self.title = title
+        self.rows = [list(r) for r in (rows or [])]
+        self.latency = latency
+        self.per_cell = per_cell
+        self.spreadsheet = spreadsheet
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _cost(self, endpoint, cells=0):
+        self.calls[endpoint] += 1
+        delay = self.latency + self.per_cell * cells
+        if delay:
+            time.sleep(delay)
+
+    @staticmethod
+    def _cells(rows):
+        return sum(len(r) for r in rows)
+
+    def _width(self):
+        return max((len(r) for r in self.rows), default=0)
+
+    def _padded(self, rows, width):
+        return [list(r) + [""] * (width - len(r)) for r in rows]
+
+    # ---- reads -------------------------------------------------------
+
+    def get_all_values(self):
+        with self._lock:
+            out = self._padded(self.rows, self._width())
+        self._cost("get_all_values", self._cells(out))
+        return out
+
+    def _read(self, rng):
+        r0, c0, r1, c1 = _parse_range(rng)
+        with self._lock:
+            out = [
+                [str(v) for v in row[c0:c1]]
+                for row in self.rows[r0:r1]
+            ]
+        # Sheets API membuang baris kosong di ujung range.
+        while out and not any(out[-1]):
+            out.pop()
+        return out
+
+    def get(self, rng):
+        out = self._read(rng)
+        self._cost("get", self._cells(out))
+        return out
+
+    def batch_get(self, ranges):
+        out = [self._read(rng) for rng in ranges]
+        self._cost("batch_get", sum(self._cells(r) for r in out))
+        return out
+
+    def row_values(self, row):
+        with self._lock:
+            out = list(self.rows[row - 1]) if len(self.rows) >= row else []
+        self._cost("row_values", len(out))
+        return out
+
+    def col_values(self, col):
+        with self._lock:
+            out = [r[col - 1] if len(r) >= col else "" for r in self.rows]
+        while out and out[-1] == "":
+            out.pop()
+        self._cost("col_values", len(out))
+        return out
+
+    # ---- writes ------------------------------------------------------
+
+    def update(self, rng, values, **kwargs):
+        r0, c0, _, _ = _parse_range(rng)
+        with self._lock:
+            while len(self.rows) < r0 + len(values):
+                self.rows.append([])
+            for i, vals in enumerate(values):
+                row = self.rows[r0 + i]
+                if len(row) < c0 + len(vals):
+                    row.extend([""] * (c0 + len(vals) - len(row)))
+                row[c0:c0 + len(vals)] = [str(v) for v in vals]
+        self._cost("update", self._cells(values))
+        return {"updatedRange": f"{self.title}!{rng}"}
+
+    def append_rows(self, values, **kwargs):
+        with self._lock:
+            start = len(self.rows) + 1
+            self.rows.extend([str(v) for v in row] for row in values)
+            end = len(self.rows)
+        self._cost("append_rows", self._cells(values))
+        return {
+            "updates": {"updatedRange": f"{self.title}!A{start}:Z{end}"}
+        }
+
+    def append_row(self, values, **kwargs):
+        return self.append_rows([values], **kwargs)
+
+    def clear(self):
+        with self._lock:
+            self.rows = []
+        self._cost("clear")
+
+
+class FakeSpreadsheet:
+    def __init__(self, latency=0.0, per_cell=0.0, rows=None):
+        self.latency = latency
+        self.per_cell = per_cell
+        self._worksheets = {}
+        self.sheet1 = self.add_worksheet("Sheet1", rows=rows)
+
+    def add_worksheet(self, title, rows=None, cols=None, **kwargs):
+        ws = FakeWorksheet(
+            title,
+            rows=rows if isinstance(rows, list) else None,
+            latency=self.latency,
+            per_cell=self.per_cell,
+            spreadsheet=self,
+        )
+        self._worksheets[title] = ws
+        return ws
+
+    def worksheet(self, title):
+        try:
+            return self._worksheets[title]
+        except KeyError:
+            raise WorksheetNotFound(title) from None
+
+    def worksheets(self):
+        return list(self._worksheets.values())
+
+    def values_batch_get(self, ranges, params=None):
+        """Satu request untuk beberapa range, boleh beda worksheet."""
+        value_ranges = []
+        cells = 0
+        for rng in ranges:
+            title, _, a1 = rng.partition("!")
+            title = title[1:-1].replace("''", "'") if title[:1] == "'" else title
+            values = self.worksheet(title)._read(a1)
+            cells += FakeWorksheet._cells(values)
+            value_ranges.append({"range": rng, "values": values})
+        self.sheet1.calls["values_batch_get"] += 1
+        delay = self.latency + self.per_cell * cells
+        if delay:
+            time.sleep(delay)
+        return {"valueRanges": value_ranges}
+
+    def call_counts(self) -> Counter:
+        total = Counter()
+        for ws in self._worksheets.values():
+            total.update(ws.calls)
+        return total
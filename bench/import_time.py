@@ -0,0 +1,102 @@
+"""
+Ukur cold start di proses Python baru.
+
+    python bench/import_time.py [--budget-ms 80] [--runs 5]
+    python bench/import_time.py --target login [--budget-ms 400]
+
+- target "analysis": waktu `import analysis`; tidak boleh ikut me-load
+  Streamlit / gspread / pandas / PyMuPDF.
+- target "login": waktu satu run app.py sampai halaman login selesai
+  dirender (lewat AppTest, Streamlit sendiri sudah di-import dan tidak
+  dihitung). Warm-up background dimatikan supaya yang terukur hanya yang
+  benar-benar dibutuhkan halaman login; tidak boleh me-load gspread /
+  google-auth / pandas / PyMuPDF.
+
+Exit code 1 kalau median melewati budget atau ada modul berat yang ikut
+ter-load.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = {
+    "analysis": ["streamlit", "gspread", "pandas", "fitz"],
+    "login": ["gspread", "google.oauth2", "pandas", "numpy", "fitz"],
+}
+DEFAULT_BUDGET_MS = {"analysis": 80.0, "login": 400.0}
+
+_PROBES = {
+    "analysis": """
+import sys, time
+t0 = time.perf_counter()
+import analysis
+elapsed = time.perf_counter() - t0
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+""",
+    "login": """
+import sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=60)
+at.secrets["warm_up_modules"] = False
+t0 = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - t0
+assert not at.exception, at.exception
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+""",
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_once(target="analysis") -> tuple:
+    probe = _PROBES[target].format(heavy=HEAVY_MODULES[target])
+    out = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    elapsed = float(out[0])
+    heavy = out[1].split(",") if len(out) > 1 else []
+    return elapsed, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", default="analysis", choices=sorted(_PROBES))
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    budget_ms = args.budget_ms or DEFAULT_BUDGET_MS[args.target]
+
+    samples = []
+    heavy = []
+    for _ in range(args.runs):
+        elapsed, heavy = measure_once(args.target)
+        samples.append(elapsed * 1000)
+
+    median_ms = statistics.median(samples)
+    report = {
+        "target": args.target,
+        "runs": args.runs,
+        "median_ms": round(median_ms, 2),
+        "max_ms": round(max(samples), 2),
+        "budget_ms": budget_ms,
+        "heavy_modules_loaded": heavy,
+    }
+    print(json.dumps(report, indent=2))
+
+    if heavy or median_ms > budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
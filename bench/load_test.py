@@ -0,0 +1,336 @@
+"""
+Load test: N session Streamlit simultan menjalankan app.py.
+
+    python -m bench.load_test --sessions 1 2 4 8
+    python -m bench.load_test --sessions 4 --papers 3 --sheet-latency-ms 200 \\
+        --out bench/results/load.json
+
+Tiap session adalah satu AppTest (headless) di thread sendiri, semuanya
+dalam satu proses, jadi cache_resource (pool ekstraksi, review store,
+koneksi sheet) dipakai bersama seperti di satu instance server. Alur per
+session: login lewat sidebar (login_block), lalu untuk tiap paper:
+upload PDF sintetis dari bench.corpus (tiap upload isinya beda, jadi
+tidak kena cache/paper index), jawab semua pertanyaan Yes/No, isi
+advisor / reviewer / overall evaluation, submit. Google Sheets diganti
+bench.fake_sheets lewat sheet_utils.configure, dengan latency buatan.
+
+Setiap `run()` AppTest = satu rerun; durasinya dicatat per langkah
+(login, upload, answer, field, submit). Laporan per jumlah session:
+throughput review/detik, p50/p99 latency rerun (total dan per langkah),
+dan jumlah error. Semua state (SQLite, cache, secrets) ada di folder
+sementara. `--max-p99-ms` membuat exit code 1 kalau p99 melewati batas,
+supaya regresi kapasitas ketahuan di CI.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Harus sama dengan USERS di app.py.
+REVIEWERS = [("reviewer1", "rev123"), ("reviewer2", "rev456")]
+STEPS = ["login", "upload", "answer", "field", "submit"]
+
+
+def _percentile(sorted_ms, q):
+    if not sorted_ms:
+        return None
+    i = min(len(sorted_ms) - 1, int(round(q * (len(sorted_ms) - 1))))
+    return round(sorted_ms[i], 2)
+
+
+def _latency(samples) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "n": len(ms),
+        "p50_ms": _percentile(ms, 0.50),
+        "p99_ms": _percentile(ms, 0.99),
+        "max_ms": round(ms[-1], 2) if ms else None,
+    }
+
+
+def _write_secrets(workdir, args):
+    """Secrets lewat file, bukan AppTest.secrets (yang menukar st.secrets global)."""
+    os.makedirs(os.path.join(workdir, ".streamlit"), exist_ok=True)
+    secrets = {
+        "review_store": args.store,
+        "sheets_requests_per_minute": args.sheets_rpm,
+        "pdf_max_pages": 50,
+        "warm_up_modules": False,
+    }
+    if args.workers:
+        secrets["extract_workers"] = args.workers
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w") as f:
+        for key, value in secrets.items():
+            f.write(f"{key} = {json.dumps(value)}\n")
+
+
+def _share_script_cache():
+    """
+    AppTest membuat ScriptCache baru di setiap run, jadi app.py dikompilasi
+    ulang tiap rerun; kompilasi paralel dari banyak thread memicu bug
+    CPython < 3.12 (SystemError "AST constructor recursion depth
+    mismatch"). Server sungguhan memakai satu ScriptCache untuk semua
+    session, jadi semua instance di sini berbagi cache yang sama.
+    """
+    from streamlit.runtime.scriptrunner import script_cache
+
+    shared = script_cache.ScriptCache()
+
+    def init(self):
+        self._cache = shared._cache
+        self._lock = shared._lock
+
+    script_cache.ScriptCache.__init__ = init
+
+
+def _pin_runtime():
+    """
+    AppTest memasang Runtime tiruan di awal setiap run dan mengosongkannya
+    lagi di akhir (AppTest sendiri tidak dibuat untuk dipakai paralel).
+    Dengan banyak thread, run yang selesai duluan mematikan run session
+    lain; di sini runtime terakhir tetap dipakai sampai diganti run baru.
+    """
+    from streamlit.runtime.runtime import Runtime
+
+    pinned = {}
+
+    def current(cls):
+        if cls._instance is not None:
+            pinned["runtime"] = cls._instance
+        return pinned.get("runtime")
+
+    def instance(cls):
+        runtime = current(cls)
+        if runtime is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return runtime
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: current(cls) is not None)
+
+
+class _Uploads:
+    """
+    Fallback untuk Streamlit tanpa AppTest.file_uploader: st.file_uploader
+    di-monkeypatch, file-nya diambil per session lewat session_state.
+    """
+
+    key = "_load_test_upload"
+
+    def __init__(self):
+        import io
+
+        import streamlit as st
+
+        class Upload(io.BytesIO):
+            name = ""
+
+        def file_uploader(*args, **kwargs):
+            upload = st.session_state.get(self.key)
+            if upload is None:
+                return None
+            f = Upload(upload[1])
+            f.name = upload[0]
+            return f
+
+        st.file_uploader = file_uploader
+
+
+class Session:
+    def __init__(self, index, papers, pdf_for, timeout, uploads=None):
+        self.index = index
+        self.user, self.password = REVIEWERS[index % len(REVIEWERS)]
+        self.papers = papers
+        self.pdf_for = pdf_for
+        self.timeout = timeout
+        self.uploads = uploads
+        self.samples = {step: [] for step in STEPS}
+        self.submitted = 0
+        self.errors = []
+
+    def _run(self, step, action=None):
+        t0 = time.perf_counter()
+        (action or self.at.run)(timeout=self.timeout)
+        self.samples[step].append(time.perf_counter() - t0)
+        if self.at.exception:
+            raise RuntimeError(f"{step}: {self.at.exception[0].value}")
+
+    def _upload(self, name, pdf):
+        if self.uploads is not None:
+            self.at.session_state[self.uploads.key] = (name, pdf)
+            self._run("upload")
+            return
+        self._run(
+            "upload",
+            self.at.file_uploader[0].set_value((name, pdf, "application/pdf")).run,
+        )
+
+    def review(self, paper):
+        from analysis import content_hash
+
+        at = self.at
+        pdf = self.pdf_for(self.index, paper)
+        file_key = f"{self.user}_{content_hash(pdf)[:16]}"
+        self._upload(f"session{self.index}-paper{paper}.pdf", pdf)
+
+        for radio in at.radio:
+            if radio.key and radio.key.startswith(file_key):
+                self._run("answer", radio.set_value("Yes").run)
+        for suffix, value in (("advisor", "Dr. Load"), ("reviewer", self.user)):
+            self._run("field", at.text_input(key=f"{file_key}_{suffix}")
+                      .input(value).run)
+        self._run("field", at.selectbox(key=f"{file_key}_overall_eval")
+                  .set_value("Accept with revision").run)
+        self._run("submit", at.button(key=f"{file_key}_submit").click().run)
+        if not any("Review submitted" in s.value for s in at.success):
+            warnings = "; ".join(w.value for w in at.warning)
+            raise RuntimeError(f"submit: {warnings or 'no confirmation'}")
+        self.submitted += 1
+
+    def __call__(self):
+        from streamlit.testing.v1 import AppTest
+
+        try:
+            self.at = AppTest.from_file(
+                os.path.join(ROOT, "app.py"), default_timeout=self.timeout
+            )
+            self._run("login")
+            self.at.sidebar.text_input[0].input(self.user)
+            self.at.sidebar.text_input[1].input(self.password)
+            self._run("login", self.at.sidebar.button[0].click().run)
+            for paper in range(self.papers):
+                self.review(paper)
+        except Exception as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+
+
+def run_level(n_sessions, args, pdf_for, uploads) -> dict:
+    sessions = [
+        Session(i, args.papers, pdf_for, args.timeout, uploads)
+        for i in range(n_sessions)
+    ]
+    threads = [
+        threading.Thread(target=s, name=f"session-{s.index}") for s in sessions
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    submitted = sum(s.submitted for s in sessions)
+    all_samples = [x for s in sessions for xs in s.samples.values() for x in xs]
+    return {
+        "sessions": n_sessions,
+        "reviews": submitted,
+        "wall_s": round(wall, 3),
+        "reviews_per_s": round(submitted / wall, 3) if wall else None,
+        "reruns_per_s": round(len(all_samples) / wall, 2) if wall else None,
+        "rerun": _latency(all_samples),
+        "steps": {
+            step: _latency([x for s in sessions for x in s.samples[step]])
+            for step in STEPS
+        },
+        "errors": [e for s in sessions for e in s.errors],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--papers", type=int, default=2,
+                        help="reviews submitted per session")
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--store", default="sqlite", choices=["sqlite", "sheets"])
+    parser.add_argument("--workers", type=int, default=None,
+                        help="extract workers (default: CPU count)")
+    parser.add_argument("--existing-rows", type=int, default=500)
+    parser.add_argument("--sheet-latency-ms", type=float, default=50.0)
+    parser.add_argument("--sheets-rpm", type=float, default=6000.0)
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="seconds per rerun before it counts as failed")
+    parser.add_argument("--max-p99-ms", type=float, default=None)
+    parser.add_argument("--out", default=None, help="write JSON here")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    _write_secrets(workdir, args)
+    os.chdir(workdir)  # app.py memakai path relatif (.data/, .cache/)
+    sys.path.insert(0, ROOT)
+
+    import sheet_utils
+    from analysis import COLUMNS
+    from bench import corpus
+    from bench.fake_sheets import FakeSpreadsheet
+    from bench.run import _review_row
+    from streamlit.testing.v1 import AppTest
+
+    fake = FakeSpreadsheet(
+        latency=args.sheet_latency_ms / 1000,
+        rows=[list(COLUMNS)]
+        + [_review_row(i) for i in range(args.existing_rows)],
+    )
+    sheet_utils.configure(lambda: fake)
+    _share_script_cache()
+    _pin_runtime()
+    uploads = None if hasattr(AppTest, "file_uploader") else _Uploads()
+
+    level_seed = {"n": 0}
+
+    def pdf_for(session, paper):
+        rng = random.Random(f"{args.seed}-{level_seed['n']}-{session}-{paper}")
+        return corpus.make_pdf(rng, args.pages, 30)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "cpus": os.cpu_count(),
+            "workdir": workdir,
+            "args": vars(args),
+        },
+        "levels": [],
+    }
+    for n in args.sessions:
+        level_seed["n"] += 1
+        level = run_level(n, args, pdf_for, uploads)
+        report["levels"].append(level)
+        print(
+            f"{n:3d} sessions: {level['reviews']:3d} reviews in "
+            f"{level['wall_s']:7.2f}s  {level['reviews_per_s']:6.2f} reviews/s  "
+            f"rerun p50 {level['rerun']['p50_ms']} ms  "
+            f"p99 {level['rerun']['p99_ms']} ms  errors {len(level['errors'])}",
+            file=sys.stderr,
+        )
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        out = os.path.join(ROOT, args.out) if not os.path.isabs(args.out) else args.out
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    failed = any(level["errors"] for level in report["levels"])
+    if args.max_p99_ms is not None:
+        failed = failed or any(
+            (level["rerun"]["p99_ms"] or 0) > args.max_p99_ms
+            for level in report["levels"]
+        )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
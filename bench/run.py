@@ -0,0 +1,347 @@
+"""
+Benchmark jalur PDF dan jalur Google Sheets.
+
+    python -m bench.run --out bench/results/run.json
+    python -m bench.run --baseline bench/results/old.json
+
+Jalur PDF memakai korpus sintetis dari bench.corpus. Jalur Sheets memakai
+bench.fake_sheets dengan latency buatan, lewat SheetPool yang sama dengan
+app. app.py sendiri tidak bisa di-import di luar Streamlit, jadi yang
+diukur untuk save_review_to_sheet / load_reviews_from_sheet adalah
+jalur datanya: `open_store(...)` (per jenis store di `--stores`) dengan
+`save` / `load_all`, lalu `review_frame.to_frame`.
+Bagian "frame" membandingkan DataFrame string polos dengan DataFrame
+bertipe dari review_frame (memori per baris, filter, sort), dan mengecek
+bahwa konversi bolak-balik ke teks tidak mengubah nilai (exit code 1
+kalau ada yang berubah).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from analysis import (
+    COLUMNS,
+    HEADINGS,
+    analyze,
+    detect_heading_presence,
+    extract_author,
+    extract_title,
+)
+from bench import corpus
+from bench.fake_sheets import FakeSpreadsheet
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _summary(samples) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "p50_ms": round(ms[len(ms) // 2], 4),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 4),
+        "min_ms": round(ms[0], 4),
+        "max_ms": round(ms[-1], 4),
+    }
+
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return time.perf_counter() - t0, out
+
+
+def _full_text(pdf_bytes) -> str:
+    import fitz  # PyMuPDF
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return "".join(page.get_text() for page in doc)
+
+
+def bench_pdf(docs, repeat) -> dict:
+    samples = {
+        "fitz_full_text": [],
+        "extract_title": [],
+        "extract_author": [],
+        "detect_heading_presence": [],
+        "analyze": [],
+    }
+    by_pages = {}
+
+    for doc in docs:
+        for _ in range(repeat):
+            dt, text = _timed(_full_text, doc["pdf"])
+            samples["fitz_full_text"].append(dt)
+
+            lines = text.split("\n")
+            dt, (_, title_idx) = _timed(extract_title, lines)
+            samples["extract_title"].append(dt)
+
+            dt, _ = _timed(extract_author, lines, title_idx)
+            samples["extract_author"].append(dt)
+
+            t0 = time.perf_counter()
+            for heading in HEADINGS:
+                detect_heading_presence(text, heading)
+            samples["detect_heading_presence"].append(time.perf_counter() - t0)
+
+            dt, _ = _timed(analyze, doc["pdf"])
+            samples["analyze"].append(dt)
+            by_pages.setdefault(str(doc["pages"]), []).append(dt)
+
+    results = {name: _summary(s) for name, s in samples.items()}
+    results["analyze_by_pages"] = {
+        pages: _summary(s)
+        for pages, s in sorted(by_pages.items(), key=lambda kv: int(kv[0]))
+    }
+    return results
+
+
+def _review_row(i):
+    row = {col: "" for col in COLUMNS}
+    row.update(
+        {
+            "timestamp": f"2025-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}",
+            "reviewer_user": f"reviewer{i % 5}",
+            "reviewer_role": "Reviewer",
+            "file_name": f"paper_{i}.pdf",
+            "title": f"Synthetic paper number {i}",
+            "status": "✅ Compliant",
+            "overall_eval": "Accept with revision",
+        }
+    )
+    return [row[col] for col in COLUMNS]
+
+
+def check_frame_roundtrip() -> list:
+    """
+    `to_text(to_frame(...))` harus mengembalikan nilai asli persis, juga
+    untuk nilai non-kanonik (diedit manual di sheet). Kembalikan daftar
+    sel yang berubah (kosong = lolos).
+    """
+    from review_frame import to_frame, to_text
+
+    col = COLUMNS.index
+    rows = [_review_row(i) for i in range(6)]
+    rows[0][col("timestamp")] = "01/02/2025 10:00"
+    rows[1][col("english_ok")] = "yes"
+    rows[2][col("english_ok")] = "YES"
+    rows[3][col("format_ok")] = "Yes"
+    rows[4][col("format_ok")] = "No"
+    rows[1][col("Introduction")] = "TRUE"
+    rows[2][col("Conclusion")] = "1"
+    rows[3][col("Conclusion")] = "0"
+    rows[5][col("timestamp")] = ""
+
+    back = to_text(to_frame(COLUMNS, rows))
+    return [
+        (i, name, value, back[name].iloc[i])
+        for i, row in enumerate(rows)
+        for name, value in zip(COLUMNS, row)
+        if back[name].iloc[i] != value
+    ]
+
+
+def bench_frame(n_rows, repeat) -> dict:
+    import pandas as pd
+
+    from review_frame import memory_per_row, to_frame
+
+    rows = [_review_row(i) for i in range(n_rows)]
+    for i, row in enumerate(rows):
+        row[COLUMNS.index("english_ok")] = "Yes" if i % 3 else "No"
+        row[COLUMNS.index("Introduction")] = str(i % 2)
+
+    samples = {"build_plain": [], "build_typed": [],
+               "filter_plain": [], "filter_typed": [],
+               "sort_plain": [], "sort_typed": []}
+    for _ in range(repeat):
+        dt, plain = _timed(pd.DataFrame, rows, columns=COLUMNS, dtype=object)
+        samples["build_plain"].append(dt)
+        dt, typed = _timed(to_frame, COLUMNS, rows)
+        samples["build_typed"].append(dt)
+
+        dt, _ = _timed(
+            lambda: plain[(plain["reviewer_user"] == "reviewer1")
+                          & (plain["english_ok"] == "Yes")]
+        )
+        samples["filter_plain"].append(dt)
+        dt, _ = _timed(
+            lambda: typed[(typed["reviewer_user"] == "reviewer1")
+                          & typed["english_ok"].fillna(False)]
+        )
+        samples["filter_typed"].append(dt)
+
+        samples["sort_plain"].append(
+            _timed(plain.sort_values, "timestamp")[0]
+        )
+        samples["sort_typed"].append(
+            _timed(typed.sort_values, "timestamp")[0]
+        )
+
+    plain_bytes = memory_per_row(plain)
+    typed_bytes = memory_per_row(typed)
+    return {
+        "rows": n_rows,
+        "bytes_per_row_plain": round(plain_bytes, 1),
+        "bytes_per_row_typed": round(typed_bytes, 1),
+        "memory_ratio": round(plain_bytes / typed_bytes, 2),
+        **{name: _summary(s) for name, s in samples.items()},
+    }
+
+
+def bench_sheets(existing_rows, writes, latency, per_cell, store="sheets") -> dict:
+    import tempfile
+
+    from review_frame import to_frame
+    from review_store import open_store
+    from sheet_utils import RateLimiter, SheetPool
+
+    rows = [list(COLUMNS)] + [_review_row(i) for i in range(existing_rows)]
+    fake = FakeSpreadsheet(latency=latency, per_cell=per_cell, rows=rows)
+    # Limiter dibuat longgar: yang diukur latency jalur data, bukan quota.
+    pool = SheetPool(
+        connect=lambda: fake,
+        limiter=RateLimiter(per_minute=1e9, burst=10**9),
+    )
+    # Sama dengan get_review_store() di app: store + outbox di file
+    # sementara, sheet sebagai mirror/sumber.
+    workdir = tempfile.mkdtemp(prefix="bench-store-")
+    opened, reviews = _timed(
+        open_store, store, path=os.path.join(workdir, "reviews.db"),
+        pool=pool, ttl=3600, partition="none",
+    )
+
+    def load():
+        header, data = reviews.load_all()
+        return to_frame(header, data)
+
+    cold, _ = _timed(load)
+    warm = [_timed(load)[0] for _ in range(writes)]
+
+    save = []
+    after_write = []
+    for i in range(writes):
+        summary = dict(zip(COLUMNS, _review_row(existing_rows + i)))
+        save.append(_timed(reviews.save, summary)[0])
+        after_write.append(_timed(load)[0])
+
+    return {
+        "store": store,
+        "existing_rows": existing_rows,
+        "latency_ms": latency * 1000,
+        "open_store": _summary([opened]),
+        "save_review_to_sheet": _summary(save),
+        "load_reviews_cold": _summary([cold]),
+        "load_reviews_warm": _summary(warm),
+        "load_reviews_after_write": _summary(after_write),
+        "pending_sync": reviews.pending_sync(),
+        "sheet_calls": dict(fake.call_counts()),
+        "pool": pool.stats(),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, path=()):
+    """Cetak rasio mean_ms current/baseline untuk tiap metrik yang sama."""
+    for key, value in current.items():
+        base = baseline.get(key) if isinstance(baseline, dict) else None
+        if isinstance(value, dict) and "mean_ms" in value and base:
+            ratio = (
+                value["mean_ms"] / base["mean_ms"]
+                if base["mean_ms"] else float("inf")
+            )
+            print(f"{'.'.join(path + (key,)):60s} {ratio:6.2f}x")
+        elif isinstance(value, dict) and isinstance(base, dict):
+            compare(value, base, path + (key,))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF and Sheets benchmarks.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--docs", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sheet-rows", type=int, nargs="+",
+                        default=[100, 2000, 10000])
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument("--stores", nargs="+", default=["sheets", "sqlite"],
+                        choices=["sheets", "sqlite"])
+    parser.add_argument("--sheet-latency-ms", type=float, default=20.0)
+    parser.add_argument("--per-cell-us", type=float, default=0.5)
+    parser.add_argument("--frame-rows", type=int, default=20000)
+    parser.add_argument("--skip-pdf", action="store_true")
+    parser.add_argument("--skip-sheets", action="store_true")
+    parser.add_argument("--skip-frame", action="store_true")
+    parser.add_argument("--out", default=None, help="write JSON here")
+    parser.add_argument("--baseline", default=None,
+                        help="earlier JSON result to compare against")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": vars(args),
+        }
+    }
+
+    if not args.skip_pdf:
+        docs = corpus.generate(seed=args.seed, size=args.docs)
+        report["pdf"] = bench_pdf(docs, args.repeat)
+
+    if not args.skip_sheets:
+        report["sheets"] = {
+            store: {
+                str(n): bench_sheets(
+                    n,
+                    args.writes,
+                    args.sheet_latency_ms / 1000,
+                    args.per_cell_us / 1_000_000,
+                    store=store,
+                )
+                for n in args.sheet_rows
+            }
+            for store in args.stores
+        }
+
+    if not args.skip_frame:
+        report["frame"] = bench_frame(args.frame_rows, args.repeat)
+        lost = check_frame_roundtrip()
+        report["frame"]["roundtrip_lost_cells"] = [list(map(str, c)) for c in lost]
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+    if report.get("frame", {}).get("roundtrip_lost_cells"):
+        sys.exit("review_frame round-trip changed values; see frame.roundtrip_lost_cells")
+
+
+if __name__ == "__main__":
+    main()
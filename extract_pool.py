@@ -0,0 +1,473 @@
+"""
+Pool ekstraksi PDF bersama untuk semua session Streamlit.
+
+Parsing PDF tidak lagi berjalan di thread script Streamlit. Setiap upload
+menjadi satu job di antrian terbatas (`max_queue`); `workers` thread
+dispatcher (default: jumlah core) masing-masing menjalankan satu job di
+proses terpisah, jadi parsing memakai semua core dan tidak menahan GIL
+server. Job yang melewati `timeout` prosesnya di-kill, sehingga satu PDF
+raksasa paling lama memakai satu worker selama `timeout` detik dan tidak
+bisa membuat session lain menunggu tanpa batas. Kalau antrian penuh,
+`submit` langsung menolak (QueueFull) supaya UI bisa meminta user mencoba
+lagi, bukan menumpuk memori.
+
+Memori: upload diterima sebagai memoryview (tanpa salinan) dan ditulis
+langsung ke pipe worker. Upload di atas `spill_bytes` ditulis ke file
+sementara dan worker membuka PDF dari disk. `MemoryBudget` membatasi
+total ukuran upload yang sedang diproses per session dan untuk seluruh
+server; upload yang melewati batas ditolak (BudgetExceeded) sebelum
+masuk antrian.
+
+Tiap dispatcher punya satu proses worker tetap (`python -m extract_pool`)
+yang menerima job lewat pipe, jadi import PyMuPDF hanya sekali per worker.
+Sengaja tidak memakai multiprocessing: di bawah Streamlit modul
+`__main__` adalah app.py, dan start method spawn/forkserver akan
+menjalankan ulang app.py di setiap proses anak.
+"""
+
+import os
+import pickle
+import queue
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from analysis import analyze
+from perf import recorder
+
+QUEUED = "queued"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+class ExtractTimeout(TimeoutError):
+    pass
+
+
+class ExtractError(RuntimeError):
+    pass
+
+
+class BudgetExceeded(RuntimeError):
+    pass
+
+
+def _mb(nbytes) -> str:
+    return f"{nbytes / (1024 * 1024):.0f} MB"
+
+
+class MemoryBudget:
+    """
+    Batas byte upload yang sedang dianalisis: per session (`owner`) dan
+    total untuk proses ini.
+    """
+
+    def __init__(self, per_session, total):
+        self.per_session = per_session
+        self.total = total
+        self._lock = threading.Lock()
+        self._used = {}
+
+    def reserve(self, owner, nbytes):
+        with self._lock:
+            mine = self._used.get(owner, 0)
+            if mine + nbytes > self.per_session:
+                raise BudgetExceeded(
+                    f"This upload ({_mb(nbytes)}) would exceed the "
+                    f"{_mb(self.per_session)} limit for PDFs being analyzed "
+                    "in one session. Wait for your other uploads to finish "
+                    "or upload a smaller file."
+                )
+            if sum(self._used.values()) + nbytes > self.total:
+                raise BudgetExceeded(
+                    "The server is analyzing too many large PDFs right now. "
+                    "Please try again in a minute."
+                )
+            self._used[owner] = mine + nbytes
+
+    def release(self, owner, nbytes):
+        with self._lock:
+            left = self._used.get(owner, 0) - nbytes
+            if left > 0:
+                self._used[owner] = left
+            else:
+                self._used.pop(owner, None)
+
+    def used(self) -> int:
+        with self._lock:
+            return sum(self._used.values())
+
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_LENGTH = struct.Struct("!Q")
+
+
+def _send(stream, obj):
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(_LENGTH.pack(len(data)))
+    stream.write(data)
+    stream.flush()
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    return data if len(data) == size else None
+
+
+def _recv(stream):
+    header = _read_exact(stream, _LENGTH.size)
+    if header is None:
+        return None
+    (size,) = _LENGTH.unpack(header)
+    data = _read_exact(stream, size)
+    return None if data is None else pickle.loads(data)
+
+
+def _send_job(stream, source, max_pages, profile=None):
+    """
+    Kirim job: path file dikirim apa adanya; buffer dikirim mentah
+    setelah header, langsung dari memoryview tanpa salinan. `profile`
+    (RuleProfile) ikut di header; worker mengompilasinya sekali per versi.
+    """
+    if isinstance(source, str):
+        _send(stream, ("path", source, max_pages, profile))
+        return
+    _send(stream, ("bytes", source.nbytes, max_pages, profile))
+    stream.write(source)
+    stream.flush()
+
+
+def _recv_job(stream):
+    message = _recv(stream)
+    if message is None:
+        return None
+    kind, value, max_pages, profile = message
+    if kind == "bytes":
+        value = _read_exact(stream, value)
+        if value is None:
+            return None
+    return value, max_pages, profile
+
+
+class _Worker:
+    """Satu proses worker; di-restart kalau di-kill atau mati."""
+
+    def __init__(self, max_jobs):
+        self.max_jobs = max_jobs
+        self.proc = None
+        self.jobs = 0
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "extract_pool"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=_HERE,
+        )
+        self.jobs = 0
+
+    def stop(self):
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def run(self, source, max_pages, timeout, profile=None):
+        """Kembalikan (status, payload, timings); status None = timeout."""
+        if self.proc is None or self.proc.poll() is not None:
+            self.start()
+        proc, killed = self.proc, threading.Event()
+
+        def kill():
+            killed.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            _send_job(self.proc.stdin, source, max_pages, profile)
+            reply = _recv(self.proc.stdout)
+        except (BrokenPipeError, OSError):
+            reply = None
+        finally:
+            timer.cancel()
+        self.jobs += 1
+
+        if reply is None:
+            self.restart()
+            if killed.is_set():
+                return None, None, {}
+            return FAILED, "worker process exited unexpectedly", {}
+        if self.jobs >= self.max_jobs:
+            self.restart()  # batasi memori yang bocor di MuPDF
+        return reply
+
+
+class Job:
+    def __init__(self, key, source, max_pages, size=0, owner=None,
+                 profile=None):
+        self.key = key
+        self.max_pages = max_pages
+        self.profile = profile
+        self.size = size
+        self.owner = owner
+        self.status = QUEUED
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self._source = source  # memoryview atau path file spill
+        self._on_finish = None
+        self._result = None
+        self._done = threading.Event()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout=None) -> bool:
+        return self._done.wait(timeout)
+
+    def result(self, timeout=None) -> dict:
+        """Hasil analyze(); raise ExtractError/ExtractTimeout kalau gagal."""
+        if not self._done.wait(timeout):
+            raise TimeoutError("Extraction still running")
+        if self.status == FAILED:
+            if isinstance(self.error, ExtractTimeout):
+                raise self.error
+            raise ExtractError(self.error)
+        return self._result
+
+    def elapsed(self) -> float:
+        """Detik sejak mulai diproses (atau sejak masuk antrian)."""
+        start = self.started_at or self.submitted_at
+        return (self.finished_at or time.monotonic()) - start
+
+    def _finish(self, status, result=None, error=None):
+        self.status = status
+        self._result = result
+        self.error = error
+        self.finished_at = time.monotonic()
+        source, self._source = self._source, None
+        if isinstance(source, str):
+            try:
+                os.unlink(source)
+            except OSError:
+                pass
+        if self._on_finish is not None:
+            self._on_finish(self)
+        self._done.set()
+
+
+class ExtractPool:
+    def __init__(self, workers=None, max_queue=16, timeout=120.0,
+                 keep_finished=64, max_jobs_per_worker=200,
+                 spill_bytes=16 * 1024 * 1024, budget=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.spill_bytes = spill_bytes
+        self.budget = budget
+        self.spilled = 0
+        self.keep_finished = keep_finished
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._waiting = []  # urutan job yang masih QUEUED
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        for i in range(self.workers):
+            threading.Thread(
+                target=self._dispatch, name=f"extract-{i}", daemon=True
+            ).start()
+
+    # ---- API ---------------------------------------------------------
+
+    def submit(self, key, pdf_data, max_pages=None, owner=None,
+               profile=None) -> Job:
+        """
+        Masukkan PDF (bytes/memoryview, tidak disalin) ke antrian. Upload
+        yang sama (key = content hash + profil aturan) memakai job yang
+        sudah ada selama belum gagal. Raise QueueFull / BudgetExceeded
+        kalau ditolak.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != FAILED:
+                self._jobs.move_to_end(key)
+                return job
+            if self._queue.full():
+                self.rejected += 1
+                raise QueueFull(f"{self._queue.qsize()} PDFs are already waiting")
+
+        view = memoryview(pdf_data).cast("B")
+        if self.budget is not None:
+            try:
+                self.budget.reserve(owner, view.nbytes)
+            except BudgetExceeded:
+                with self._lock:
+                    self.rejected += 1
+                raise
+        source = view
+        if view.nbytes > self.spill_bytes:
+            try:
+                source = self._spill(view)
+            except Exception:
+                # Job belum dibuat, jadi _release tidak akan dipanggil.
+                if self.budget is not None:
+                    self.budget.release(owner, view.nbytes)
+                raise
+
+        job = Job(
+            key, source, max_pages, size=view.nbytes, owner=owner,
+            profile=profile,
+        )
+        job._on_finish = self._release
+        with self._lock:
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.rejected += 1
+                job._finish(FAILED, error="queue full")
+                raise QueueFull(
+                    f"{self._queue.qsize()} PDFs are already waiting"
+                ) from None
+            self._jobs[key] = job
+            self._waiting.append(job)
+            self._trim()
+            return job
+
+    def _spill(self, view) -> str:
+        fd, path = tempfile.mkstemp(prefix="upload-", suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(view)
+        except BaseException:
+            os.unlink(path)
+            raise
+        with self._lock:
+            self.spilled += 1
+        return path
+
+    def _release(self, job):
+        if self.budget is not None:
+            self.budget.release(job.owner, job.size)
+
+    def position(self, job) -> int:
+        """Posisi job di antrian (1 = berikutnya), 0 kalau tidak antre."""
+        with self._lock:
+            try:
+                return self._waiting.index(job) + 1
+            except ValueError:
+                return 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            processing = sum(
+                1 for j in self._jobs.values() if j.status == PROCESSING
+            )
+            return {
+                "workers": self.workers,
+                "queued": len(self._waiting),
+                "processing": processing,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+                "spilled": self.spilled,
+                "budget_used_mb": (
+                    round(self.budget.used() / (1024 * 1024), 1)
+                    if self.budget is not None else None
+                ),
+            }
+
+    # ---- worker ------------------------------------------------------
+
+    def _trim(self):
+        finished = [k for k, j in self._jobs.items() if j.done()]
+        for key in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[key]
+
+    def _dispatch(self):
+        worker = _Worker(self.max_jobs_per_worker)
+        worker.start()  # import PyMuPDF sebelum job pertama datang
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self._waiting.remove(job)
+                job.status = PROCESSING
+                job.started_at = time.monotonic()
+            try:
+                self._run(worker, job)
+            except Exception as e:
+                worker.stop()
+                job._finish(FAILED, error=f"{type(e).__name__}: {e}")
+            with self._lock:
+                if job.status == DONE:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def _run(self, worker, job):
+        recorder.record("extract.queue_wait", job.started_at - job.submitted_at)
+        with recorder.stage("extract.worker", size=job.size):
+            status, payload, timings = worker.run(
+                job._source, job.max_pages, self.timeout, job.profile
+            )
+        for name, seconds in timings.items():
+            recorder.record(name, seconds)
+        if status is None:
+            with self._lock:
+                self.timeouts += 1
+            job._finish(FAILED, error=ExtractTimeout(
+                f"PDF analysis took longer than {self.timeout:g}s"
+            ))
+        elif status == DONE:
+            job._finish(DONE, result=payload)
+        else:
+            job._finish(FAILED, error=payload)
+
+
+def _serve():
+    """Loop proses worker: baca job dari stdin, tulis hasil ke stdout."""
+    # stdout asli khusus untuk protokol; print/warning (termasuk dari C)
+    # dialihkan ke stderr.
+    out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    try:
+        import fitz  # noqa: F401  import mahal, lakukan sebelum job pertama
+    except ImportError:
+        pass
+    inp = sys.stdin.buffer
+    while True:
+        message = _recv_job(inp)
+        if message is None:
+            return
+        source, max_pages, profile = message
+        timings = {}
+        try:
+            result = analyze(
+                source, max_pages=max_pages, timings=timings, profile=profile
+            )
+            reply = (DONE, result, timings)
+        except Exception as e:  # dikirim balik sebagai teks
+            reply = (FAILED, f"{type(e).__name__}: {e}", timings)
+        _send(out, reply)
+
+
+if __name__ == "__main__":
+    _serve()
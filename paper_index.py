@@ -0,0 +1,75 @@
+"""
+Hasil ekstraksi per hash isi PDF (SHA-256, lihat analysis.content_hash).
+
+Identitas paper adalah isi file-nya, bukan nama file atau user. Review
+yang sudah ada untuk sebuah paper dicari di review store sendiri
+(kolom `content_hash` di setiap baris review, lihat
+ReviewStore.load_for_paper), jadi ikut tersimpan di Google Sheet dan
+tidak bisa tidak sinkron dengan review-nya. Review yang disimpan sebelum
+kolom itu ada tidak punya hash, jadi yang terdeteksi hanya review
+sesudahnya.
+
+Yang disimpan di sini (SQLite lokal, default .data/papers.db) hanya
+`paper_results`: (hash, profil aturan) -> hasil ekstraksi (JSON), jadi
+PDF yang sudah pernah dianalisis tidak di-parse ulang walaupun entrinya
+sudah ter-evict dari ExtractCache.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class PaperIndex:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._init_schema()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS paper_results ("
+                "content_hash TEXT NOT NULL, "
+                "profile TEXT NOT NULL, "
+                "result TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "PRIMARY KEY (content_hash, profile))"
+            )
+
+    def result(self, digest: str, profile: str):
+        row = self._conn().execute(
+            "SELECT result FROM paper_results "
+            "WHERE content_hash = ? AND profile = ?",
+            (digest, profile),
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_result(self, digest: str, profile: str, result: dict):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO paper_results "
+                "(content_hash, profile, result, created_at) VALUES (?, ?, ?, ?)",
+                (digest, profile, json.dumps(result, ensure_ascii=False),
+                 time.time()),
+            )
+
+    def stats(self) -> dict:
+        papers, results = self._conn().execute(
+            "SELECT COUNT(DISTINCT content_hash), COUNT(*) FROM paper_results"
+        ).fetchone()
+        return {"papers": papers, "results": results}
@@ -0,0 +1,150 @@
+"""
+Instrumentasi ringan untuk jalur panas (upload, ekstraksi, save, load,
+Google Sheets).
+
+    from perf import recorder
+
+    with recorder.stage("review.save", store="sqlite"):
+        ...
+    recorder.count("extract_cache.hit")
+    recorder.add_bytes("sheets.get_all_values", n)
+
+Per stage disimpan `window` durasi terakhir (rolling) untuk p50/p95 di
+panel Admin; counter dan byte dijumlah sejak proses start. Setiap stage
+juga ditulis sebagai satu baris JSON ke logger "perf" (level INFO) kalau
+logger itu aktif, supaya bisa diolah di luar app. Logger itu diaktifkan
+dengan `configure_log(target)`: di app lewat secrets `perf_log`, di CLI
+dan bench lewat environment variable PERF_LOG (dibaca saat import).
+Target: "stderr", "stdout", atau path file (JSON lines, di-append).
+
+Hanya stdlib, aman di-import dari modul mana pun.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+log = logging.getLogger("perf")
+_handler = None
+
+
+def configure_log(target):
+    """
+    Tulis record stage ke `target` ("stderr", "stdout" atau path file);
+    None/"" = tidak mengubah apa pun. Memanggil lagi mengganti target.
+    """
+    global _handler
+    if not target:
+        return
+    if target in ("stderr", "stdout"):
+        handler = logging.StreamHandler(getattr(sys, target))
+    else:
+        handler = logging.FileHandler(target, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    if _handler is not None:
+        log.removeHandler(_handler)
+        _handler.close()
+    _handler = handler
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
+def approx_bytes(value) -> int:
+    """Perkiraan ukuran payload: panjang semua string di list bertingkat."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(approx_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(approx_bytes(v) for v in value)
+    return 0
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    i = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[i]
+
+
+class Recorder:
+    def __init__(self, window=500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._totals = Counter()
+        self.counters = Counter()
+        self.bytes = Counter()
+
+    def record(self, name, seconds, **fields):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._totals[name] += 1
+        if log.isEnabledFor(logging.INFO):
+            log.info(json.dumps(
+                {"event": "stage", "stage": name,
+                 "ms": round(seconds * 1000, 3), **fields},
+                default=str,
+            ))
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """Ukur durasi blok; error tetap dicatat (dengan field error)."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            fields["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, **fields)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def add_bytes(self, name, n):
+        with self._lock:
+            self.bytes[name] += n
+
+    def summary(self) -> dict:
+        """{stage: {count, p50_ms, p95_ms, max_ms}} dari window terakhir."""
+        with self._lock:
+            snapshot = {k: sorted(v) for k, v in self._samples.items()}
+            totals = dict(self._totals)
+        out = {}
+        for name, values in sorted(snapshot.items()):
+            out[name] = {
+                "count": totals[name],
+                "p50_ms": round(_percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+            }
+        return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "bytes": dict(self.bytes),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self.counters.clear()
+            self.bytes.clear()
+
+
+recorder = Recorder()
+configure_log(os.environ.get("PERF_LOG"))
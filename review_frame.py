@@ -0,0 +1,142 @@
+"""
+DataFrame bertipe untuk review yang di-load dari review store.
+
+Semua nilai dari Google Sheet / SQLite berupa string. Di sini tiap kolom
+langsung dibuat dengan tipe yang sesuai, jadi memori per baris jauh lebih
+kecil dan filter/sort menjadi perbandingan vektor, bukan string:
+
+- flag section (0/1)                          -> Int8 (kosong = NA)
+- jawaban Yes/No                              -> boolean (kosong = NA)
+- reviewer_user, reviewer_role, status,
+  overall_eval                                -> category
+- timestamp                                   -> datetime64
+- teks bebas (judul, komentar, ...)           -> string bawaan pandas
+
+Konversi tidak boleh menghilangkan data: kalau satu kolom berisi nilai
+di luar bentuk kanonik ("TRUE", "yes", "01/02/2025 10:00", baris yang
+diedit manual di sheet), kolom itu tetap string apa adanya.
+
+`to_text` mengembalikan nilai ke bentuk aslinya (Yes/No, "YYYY-MM-DD
+HH:MM:SS") untuk export CSV, jadi `to_text(to_frame(h, rows))` sama
+dengan `rows`; export Parquet memakai tipe aslinya.
+"""
+
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+from analysis import COLUMNS, HEADINGS
+
+FLAG_COLUMNS = [heading.capitalize() for heading in HEADINGS]
+ANSWER_COLUMNS = [
+    "english_ok",
+    "format_ok",
+    "sota_ok",
+    "clarity_ok",
+    "figures_ok",
+    "conclusion_ok",
+    "references_ok",
+]
+CATEGORY_COLUMNS = ["reviewer_user", "reviewer_role", "status", "overall_eval"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+TIMESTAMP_PATTERN = r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"
+CSV_CHUNK_ROWS = 5000
+
+
+def _only(values, allowed) -> bool:
+    return set(pd.unique(values)) <= allowed
+
+
+def _column(col, values) -> pd.Series:
+    values = np.asarray(values, dtype=object)
+    if col in FLAG_COLUMNS and _only(values, {"", "0", "1"}):
+        return pd.Series(
+            pd.arrays.IntegerArray((values == "1").astype("int8"), values == "")
+        )
+    if col in ANSWER_COLUMNS and _only(values, {"", "Yes", "No"}):
+        yes, no = values == "Yes", values == "No"
+        return pd.Series(pd.arrays.BooleanArray(yes, ~(yes | no)))
+    if col in CATEGORY_COLUMNS:
+        return pd.Series(pd.Categorical(values))
+    if col == "timestamp":
+        filled = values[values != ""]
+        pattern = re.compile(TIMESTAMP_PATTERN)
+        if all(isinstance(v, str) and pattern.fullmatch(v) for v in filled):
+            parsed = pd.to_datetime(values, format=TIMESTAMP_FORMAT, errors="coerce")
+            if parsed.notna().sum() == len(filled):
+                return pd.Series(parsed)
+    return pd.Series(values, dtype=str)
+
+
+def to_frame(header, rows) -> pd.DataFrame:
+    """
+    Buat DataFrame bertipe dengan kolom `COLUMNS` dari (header, rows).
+    Kolom yang tidak ada di `header` diisi kosong.
+    """
+    index = {col: i for i, col in enumerate(header)}
+    # Transpose sekali di C; baris pendek (sel kosong di ujung) jadi NA.
+    raw = pd.DataFrame(rows, dtype=object)
+    blank = np.full(len(rows), "", dtype=object)
+    data = {}
+    for col in COLUMNS:
+        i = index.get(col)
+        if i is not None and i < raw.shape[1]:
+            values = raw[i].to_numpy(dtype=object, na_value="")
+        else:
+            values = blank
+        data[col] = _column(col, values)
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def to_text(df: pd.DataFrame) -> pd.DataFrame:
+    """Salinan `df` dengan nilai dalam format asli sheet (untuk export)."""
+    out = df.copy()
+    # Kolom yang tetap string (ada nilai non-kanonik) dibiarkan apa adanya.
+    for col in FLAG_COLUMNS:
+        if col in out and pd.api.types.is_integer_dtype(out[col]):
+            out[col] = out[col].map({0: "0", 1: "1"}).astype(object).fillna("")
+    for col in ANSWER_COLUMNS:
+        if col in out and pd.api.types.is_bool_dtype(out[col]):
+            out[col] = (
+                out[col].map({True: "Yes", False: "No"}).astype(object).fillna("")
+            )
+    if "timestamp" in out and pd.api.types.is_datetime64_any_dtype(out["timestamp"]):
+        out["timestamp"] = out["timestamp"].dt.strftime(TIMESTAMP_FORMAT).fillna("")
+    return out
+
+
+def memory_per_row(df: pd.DataFrame) -> float:
+    """Byte per baris (deep, termasuk isi string)."""
+    if len(df) == 0:
+        return 0.0
+    return df.memory_usage(deep=True, index=False).sum() / len(df)
+
+
+def iter_csv(df: pd.DataFrame, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    CSV (bytes UTF-8) per potongan `chunk_rows` baris, header hanya di
+    potongan pertama. Konversi teks dan encode dilakukan per potongan,
+    jadi salinan teks (`to_text`) tidak pernah dibuat untuk seluruh tabel
+    sekaligus.
+    """
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = to_text(df.iloc[start:start + chunk_rows])
+        yield chunk.to_csv(index=False, header=start == 0).encode("utf-8")
+
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Seluruh CSV sebagai satu objek bytes (tidak di-stream): download
+    button dan cache export butuh isi lengkap. Yang hemat memori hanya
+    langkah konversinya, lihat `iter_csv`.
+    """
+    return b"".join(iter_csv(df))
+
+
+def to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    """Parquet dengan tipe kolom asli (butuh pyarrow)."""
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
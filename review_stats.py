@@ -0,0 +1,252 @@
+"""
+Agregat review yang di-update incremental setiap ada review baru: jumlah
+per status, reviewer, advisor dan overall_eval, plus berapa kali tiap
+section wajib tidak ditemukan. Panel statistik cukup membaca beberapa
+baris ini, bukan seluruh riwayat review.
+
+Agregat disimpan sebagai baris (dimension, key, count):
+- mode "sqlite": tabel `review_stats` di database review, di-update dalam
+  transaksi yang sama dengan insert review;
+- mode "sheets": worksheet kecil `review_stats` (SheetStatsTable), di-update
+  setelah batch review ditulis ke sheet.
+
+Kalau agregat melenceng (mis. baris review diedit manual di sheet),
+hitung ulang dari semua review:
+
+    python review_stats.py rebuild
+    python review_stats.py rebuild --store sheets
+"""
+
+import argparse
+import logging
+import threading
+import time
+from collections import Counter
+
+from analysis import COLUMNS, HEADINGS
+from sheet_utils import PRIORITY_SUMMARY, PRIORITY_WRITE, PartialAppendError
+
+log = logging.getLogger(__name__)
+
+TOTAL = "total"
+MISSING = "missing_section"
+GROUP_COLUMNS = ["status", "reviewer_user", "advisor", "overall_eval"]
+SECTION_COLUMNS = [heading.capitalize() for heading in HEADINGS]
+HEADER = ["dimension", "key", "count"]
+BLANK = "(blank)"
+# Baris penanda di worksheet agregat: tabel sudah pernah dibangun dari
+# semua review (nilainya waktu build). Tidak ikut dikembalikan `read`.
+BUILT = ("_built", "at")
+
+
+def deltas(rows, header=COLUMNS) -> Counter:
+    """Counter {(dimension, key): jumlah} untuk `rows` (list nilai per `header`)."""
+    index = {col: i for i, col in enumerate(header)}
+    counts = Counter()
+    for row in rows:
+        values = {
+            col: str(row[i]).strip() if i < len(row) else ""
+            for col, i in index.items()
+        }
+        counts[(TOTAL, "all")] += 1
+        for col in GROUP_COLUMNS:
+            counts[(col, values.get(col) or BLANK)] += 1
+        for col in SECTION_COLUMNS:
+            if values.get(col, "") in ("", "0"):
+                counts[(MISSING, col)] += 1
+    return counts
+
+
+def as_tables(counts) -> dict:
+    """{dimension: {key: count}} dari Counter hasil `deltas`."""
+    tables = {}
+    for (dimension, key), n in sorted(counts.items()):
+        tables.setdefault(dimension, {})[key] = n
+    return tables
+
+
+def missing_rates(counts) -> dict:
+    """Proporsi review yang tidak punya tiap section wajib."""
+    total = counts.get((TOTAL, "all"), 0)
+    return {
+        col: counts.get((MISSING, col), 0) / total if total else 0.0
+        for col in SECTION_COLUMNS
+    }
+
+
+def _to_rows(counts):
+    return [HEADER] + [
+        [dimension, key, n] for (dimension, key), n in sorted(counts.items())
+    ]
+
+
+def _from_rows(values) -> Counter:
+    counts = Counter()
+    for row in values[1:]:
+        if len(row) >= 3 and row[0]:
+            try:
+                counts[(row[0], row[1])] = int(row[2])
+            except ValueError:
+                continue
+    return counts
+
+
+class SheetStatsTable:
+    """
+    Agregat di worksheet `title` (3 kolom, beberapa puluh baris). Hanya
+    worker outbox proses ini yang menulis, jadi read-modify-write per
+    batch aman; edit dari luar diperbaiki dengan `replace`/rebuild.
+
+    `source` (callable -> Counter agregat semua review) dipakai untuk
+    membangun tabel yang belum pernah dibangun (deployment lama, worksheet
+    baru/kosong) sebelum delta pertama ditambahkan; lihat `ensure_built`.
+    """
+
+    def __init__(self, pool, title="review_stats", ttl=60.0, source=None):
+        self._pool = pool
+        self.title = title
+        self.ttl = ttl
+        self.source = source
+        self._lock = threading.Lock()
+        self._counts = None
+        self._loaded_at = None
+        self._built = False
+
+    def _ensure(self):
+        if self._counts is None:
+            self._pool.ensure_worksheet(self.title, cols=len(HEADER))
+
+    def _fetch(self) -> Counter:
+        self._ensure()
+        values = self._pool.call(
+            lambda w: w.get_all_values(), title=self.title,
+            endpoint="get_all_values", priority=PRIORITY_SUMMARY,
+        )
+        counts = _from_rows(values)
+        self._built = counts.pop(BUILT, None) is not None
+        self._counts = counts
+        self._loaded_at = time.monotonic()
+        return self._counts
+
+    def _write(self, counts, clear=False):
+        self._ensure()
+        rows = _to_rows(counts) + [[*BUILT, int(time.time())]]
+
+        def write(ws):
+            if clear:
+                ws.clear()
+            ws.update("A1", rows)
+
+        self._pool.call(
+            write, title=self.title, endpoint="update", priority=PRIORITY_WRITE
+        )
+        self._counts = Counter(counts)
+        self._loaded_at = time.monotonic()
+        self._built = True
+
+    def _build(self) -> Counter:
+        if self.source is None:
+            raise RuntimeError(f"{self.title} was never built and has no source")
+        counts = Counter(self.source())
+        self._write(counts, clear=True)
+        return counts
+
+    def built(self) -> bool:
+        """True kalau tabel pernah dibangun dari semua review (ada penanda)."""
+        with self._lock:
+            if not self._built:
+                self._fetch()
+            return self._built
+
+    def ensure_built(self):
+        """
+        Bangun tabel dari `source` kalau belum pernah. Panggil sebelum
+        review baru ditulis, supaya review itu tidak terhitung dua kali
+        (sekali di build, sekali lewat `apply`).
+        """
+        with self._lock:
+            if not self._built:
+                self._fetch()
+            if not self._built:
+                self._build()
+
+    def read(self) -> Counter:
+        with self._lock:
+            fresh = (
+                self._counts is not None
+                and time.monotonic() - self._loaded_at < self.ttl
+            )
+            return Counter(self._counts if fresh else self._fetch())
+
+    def apply(self, delta):
+        """
+        Tambahkan `delta` (hasil `deltas`) ke agregat di sheet. Tabel yang
+        belum pernah dibangun diisi dulu dari `source`, jadi jumlahnya
+        bukan hanya delta.
+        """
+        with self._lock:
+            counts = self._fetch()
+            if not self._built:
+                counts = self._build()
+            counts.update(delta)
+            # Key tidak pernah hilang, jadi menimpa dari A1 cukup.
+            self._write(counts)
+
+    def replace(self, counts):
+        with self._lock:
+            self._write(counts, clear=True)
+
+
+class StatsSink:
+    """
+    Sink outbox untuk mode "sheets": append review ke sheet, lalu update
+    agregat. Gagal update agregat hanya di-log (review sudah tertulis,
+    jangan sampai dikirim ulang); rebuild yang memperbaikinya.
+    """
+
+    def __init__(self, sheet, stats):
+        self.sheet = sheet
+        self.stats = stats
+
+    def append_rows(self, rows, header=COLUMNS):
+        try:
+            self.stats.ensure_built()
+        except Exception:
+            log.exception("Could not build review_stats; run a rebuild")
+        try:
+            self.sheet.append_rows(rows, header)
+        except PartialAppendError as e:
+            self._apply([rows[i] for i in e.written], header)
+            raise
+        self._apply(rows, header)
+
+    def _apply(self, rows, header):
+        try:
+            self.stats.apply(deltas(rows, header))
+        except Exception:
+            log.exception("Could not update review_stats; run a rebuild")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Review aggregate maintenance.")
+    parser.add_argument("command", choices=["rebuild", "show"])
+    parser.add_argument("--store", default="sqlite", choices=["sqlite", "sheets"])
+    parser.add_argument("--db", default=".data/reviews.db")
+    parser.add_argument("--partition", default="semester",
+                        choices=["none", "month", "semester"])
+    args = parser.parse_args(argv)
+
+    from review_store import open_store
+
+    store = open_store(
+        args.store, path=args.db, mirror=False, partition=args.partition
+    )
+    counts = store.rebuild_stats() if args.command == "rebuild" else store.stats()
+    for dimension, table in as_tables(counts).items():
+        print(dimension)
+        for key, n in table.items():
+            print(f"  {key:40s} {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,531 @@
+"""
+Penyimpanan review di balik satu interface.
+
+- SheetsReviewStore: Google Sheet sebagai satu-satunya database (perilaku
+  lama), lewat pool koneksi + snapshot di sheet_utils. Review bisa dibagi
+  ke worksheet per bulan/semester (PartitionedSheet).
+- SQLiteReviewStore: database lokal sebagai store utama; baca/tulis cuma
+  beberapa milidetik. Google Sheet menjadi mirror untuk orang yang
+  membaca spreadsheet.
+
+Di kedua mode, tulisan ke Google Sheet bisa lewat SheetOutbox
+(sheet_queue.py): submit hanya menulis ke antrian lokal, worker yang
+mengirim ke sheet secara batch dengan retry.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from analysis import COLUMNS
+from review_stats import SheetStatsTable, StatsSink, deltas
+from sheet_queue import SheetOutbox
+from sheet_utils import Partitioning, PartitionedSheet, align_rows, get_pool
+
+log = logging.getLogger(__name__)
+
+
+class ReviewStore:
+    """Interface yang dipakai app untuk menyimpan dan membaca review."""
+
+    name = "base"
+    outbox = None
+    seed_error = None
+
+    def save(self, summary: dict):
+        """
+        Simpan satu review. Kembalikan nomor urut review itu (1-based),
+        atau None kalau review baru masuk antrian dan nomornya belum ada.
+        """
+        raise NotImplementedError
+
+    def load_all(self, periods=None):
+        """
+        Kembalikan (header, rows) semua review, rows berupa list string.
+        `periods` (list key dari `periods()`) membatasi ke periode itu saja.
+        """
+        raise NotImplementedError
+
+    def periods(self) -> list:
+        """Key periode yang punya review, urut kronologis."""
+        return []
+
+    def current_period(self):
+        """Key periode berjalan, None kalau review tidak dipartisi."""
+        return None
+
+    def load_for_reviewer(self, reviewer_user: str):
+        """(header, rows) hanya untuk review milik satu reviewer."""
+        header, rows = self.load_all()
+        col = header.index("reviewer_user")
+        return header, [r for r in rows if r[col] == reviewer_user]
+
+    def load_for_paper(self, content_hash: str):
+        """(header, rows) review untuk paper dengan hash isi `content_hash`."""
+        header, rows = self.load_all()
+        col = header.index("content_hash")
+        return header, [r for r in rows if r[col] == content_hash]
+
+    def count(self):
+        """Jumlah review yang diketahui, atau None kalau tidak murah dihitung."""
+        return None
+
+    def age(self):
+        """Detik sejak data terakhir disinkron, None kalau selalu up to date."""
+        return None
+
+    def version(self):
+        """
+        Token yang berubah setiap kali isi review berubah (untuk cache
+        export), atau None kalau tidak diketahui.
+        """
+        return None
+
+    def stats(self):
+        """
+        Agregat review sebagai Counter {(dimension, key): count} (lihat
+        review_stats.py). Default: dihitung dari semua review.
+        """
+        header, rows = self.load_all()
+        return deltas(rows, header)
+
+    def rebuild_stats(self):
+        """Hitung ulang agregat yang tersimpan dari semua review."""
+        return self.stats()
+
+    def pending_sync(self) -> int:
+        """Jumlah review yang belum sampai ke Google Sheet."""
+        return self.outbox.pending() if self.outbox is not None else 0
+
+    def failed_sync(self) -> int:
+        """Jumlah review di dead-letter (gagal terus dikirim ke sheet)."""
+        return self.outbox.dead() if self.outbox is not None else 0
+
+    def seeded(self) -> bool:
+        """False kalau review lama dari Google Sheet belum berhasil diimpor."""
+        return True
+
+    def retry_seed(self, force=False) -> bool:
+        """Coba lagi impor review lama kalau belum berhasil; kembalikan seeded()."""
+        return self.seeded()
+
+
+class SheetsReviewStore(ReviewStore):
+    name = "sheets"
+
+    def __init__(self, pool=None, ttl=30.0, outbox=None, sheet=None,
+                 stats_table=None):
+        self._pool = pool or get_pool()
+        self._ttl = ttl
+        self.outbox = outbox
+        self.sheet = sheet or PartitionedSheet(
+            self._pool, Partitioning("none"), COLUMNS, ttl=ttl
+        )
+        self.stats_table = stats_table
+        if stats_table is not None and stats_table.source is None:
+            stats_table.source = lambda: ReviewStore.stats(self)
+        self._lock = threading.Lock()
+        self._matched_rows = {}
+        self._index_generation = {}
+
+    def _snapshot(self):
+        return self.sheet.snapshot(self.sheet.current_title())
+
+    def save(self, summary: dict):
+        row = [summary.get(col, "") for col in COLUMNS]
+        if self.outbox is not None:
+            self.outbox.enqueue(row)
+            return None
+        if self.stats_table is not None:
+            StatsSink(self.sheet, self.stats_table).append_rows([row])
+            return None
+        if self.sheet.partitioning.enabled:
+            self.sheet.append_rows([row])
+            return None
+        # Nomor baris sheet termasuk header -> nomor review = baris - 1.
+        return self._pool.append_rows([row], COLUMNS) - 1
+
+    def _titles(self, periods):
+        titles = self.sheet.titles()
+        if periods is None:
+            return titles
+        wanted = set(periods)
+        return [t for t in titles if self.sheet.key_of(t) in wanted]
+
+    def load_all(self, periods=None):
+        parts = self.sheet.read(self._titles(periods))
+        rows = [row for title in parts for row in parts[title]]
+        return list(COLUMNS), rows
+
+    def periods(self):
+        if not self.sheet.partitioning.enabled:
+            return []
+        return [self.sheet.key_of(t) for t in self.sheet.titles()]
+
+    def current_period(self):
+        if not self.sheet.partitioning.enabled:
+            return None
+        return self.sheet.partitioning.current_key()
+
+    def load_for_reviewer(self, reviewer_user: str):
+        """
+        Per partisi: kalau isinya sudah ter-cache penuh (partisi lama yang
+        pernah dibaca, atau snapshot partisi berjalan yang masih segar,
+        mis. Admin baru saja membuka summary), cukup difilter di memori.
+        Kalau tidak, pakai index kolom reviewer_user partisi itu dan ambil
+        hanya baris milik reviewer itu yang belum pernah diambil; sheet
+        lama yang besar tidak pernah diunduh penuh untuk satu reviewer.
+        """
+        return self._load_where("reviewer_user", reviewer_user)
+
+    def load_for_paper(self, content_hash: str):
+        """Sama seperti load_for_reviewer, lewat index kolom content_hash."""
+        return self._load_where("content_hash", content_hash)
+
+    def _load_where(self, column, value):
+        current = self.sheet.current_title()
+        rows = []
+        for title in self.sheet.titles():
+            rows += self._rows_where(title, column, value, closed=title != current)
+        return list(COLUMNS), rows
+
+    def _rows_where(self, title, column, value, closed):
+        if closed:
+            frozen = self.sheet.cached(title)
+            if frozen is not None:
+                col = COLUMNS.index(column)
+                return [r for r in frozen if r[col] == value]
+        else:
+            cached = self._snapshot().cached()
+            if cached is not None and cached[0]:
+                header, rows = cached
+                if column not in header:
+                    return []
+                col = header.index(column)
+                mine = [r for r in rows if r[col] == value]
+                return align_rows(header, mine, COLUMNS)
+
+        # Partisi lama hanya berubah lewat append (yang meng-invalidate
+        # index-nya), jadi tidak perlu dicek ulang per TTL.
+        index = self._pool.column_index(
+            column, title=title, ttl=float("inf") if closed else self._ttl
+        )
+        try:
+            row_numbers = index.rows_for(value)
+        except KeyError:
+            return []  # sheet lama tanpa kolom ini: belum ada yang cocok
+        with self._lock:
+            key = (title, column)
+            if self._index_generation.get(key) != index.generation:
+                self._matched_rows[key] = {}
+                self._index_generation[key] = index.generation
+            known = self._matched_rows[key].setdefault(value, {})
+            missing = [r for r in row_numbers if r not in known]
+
+        fetched = index.fetch_rows(missing)
+        with self._lock:
+            known.update(fetched)
+            rows = [known[r] for r in row_numbers if r in known]
+        return align_rows(index.header, rows, COLUMNS)
+
+    def count(self):
+        if self.sheet.partitioning.enabled:
+            return None
+        return self._pool.row_count()
+
+    def age(self):
+        return self._snapshot().age()
+
+    def version(self):
+        # Partisi lama tidak berubah lagi; cukup daftar partisi + versi
+        # snapshot partisi berjalan.
+        return tuple(self.sheet.titles()), self._snapshot().version
+
+    def stats(self):
+        if self.stats_table is None:
+            return super().stats()
+        if not self.stats_table.built():
+            # Worksheet agregat belum pernah dibangun (deployment lama): isi sekali.
+            return self.rebuild_stats()
+        return self.stats_table.read()
+
+    def rebuild_stats(self):
+        counts = super().stats()
+        if self.stats_table is not None:
+            self.stats_table.replace(counts)
+        return counts
+
+
+def _quote(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+
+_COLS_SQL = ", ".join(_quote(c) for c in COLUMNS)
+_PARAMS_SQL = ", ".join("?" for _ in COLUMNS)
+
+
+class SQLiteReviewStore(ReviewStore):
+    """
+    Review disimpan di tabel `reviews` (satu kolom TEXT per `COLUMNS`),
+    dengan index untuk reviewer_user, file_name, timestamp dan
+    content_hash (paper yang sama, lihat paper_index.py). Kalau ada
+    `outbox`, tiap review juga di-enqueue ke sheet dalam transaksi yang
+    sama; `seed_pool` dipakai untuk mengimpor review yang sudah ada di
+    sheet (semua partisi). Impor itu baru dianggap selesai setelah
+    berhasil (ditandai di tabel `meta`); selama belum, `retry_seed()`
+    mencoba lagi paling sering tiap `seed_retry_interval` detik.
+    `partitioning` hanya menentukan pengelompokan periode untuk filter;
+    semua review tetap di satu tabel.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, outbox=None, seed_pool=None, partitioning=None,
+                 seed_retry_interval=60.0):
+        self.path = path
+        self.outbox = outbox
+        self.partitioning = partitioning or Partitioning("none")
+        self.seed_retry_interval = seed_retry_interval
+        self._local = threading.local()
+        self._seed_pool = seed_pool
+        self._seed_lock = threading.Lock()
+        self._seed_attempt_at = None
+        self._seeded = seed_pool is None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+        if seed_pool is not None:
+            self.retry_seed(force=True)
+
+    # ---- koneksi & schema -------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        cols = ", ".join(f"{_quote(c)} TEXT NOT NULL DEFAULT ''" for c in COLUMNS)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS reviews ("
+                f"id INTEGER PRIMARY KEY AUTOINCREMENT, {cols})"
+            )
+            # Database lama: tambahkan kolom yang baru ada di COLUMNS.
+            existing = {r[1] for r in conn.execute("PRAGMA table_info(reviews)")}
+            for col in COLUMNS:
+                if col not in existing:
+                    conn.execute(
+                        f"ALTER TABLE reviews ADD COLUMN {_quote(col)} "
+                        f"TEXT NOT NULL DEFAULT ''"
+                    )
+            for col in ("reviewer_user", "file_name", "timestamp", "content_hash"):
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_reviews_{col} "
+                    f"ON reviews ({_quote(col)})"
+                )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS review_stats ("
+                "dimension TEXT NOT NULL, key TEXT NOT NULL, "
+                "count INTEGER NOT NULL, PRIMARY KEY (dimension, key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+        # Database lama (sebelum ada review_stats): isi sekali.
+        has_stats = conn.execute("SELECT 1 FROM review_stats LIMIT 1").fetchone()
+        if not has_stats and self.count():
+            self.rebuild_stats()
+
+    def _add_stats(self, conn, counts):
+        conn.executemany(
+            "INSERT INTO review_stats (dimension, key, count) VALUES (?, ?, ?) "
+            "ON CONFLICT (dimension, key) DO UPDATE "
+            "SET count = count + excluded.count",
+            [(dimension, key, n) for (dimension, key), n in counts.items()],
+        )
+
+    # ---- API store ---------------------------------------------------
+
+    def save(self, summary: dict):
+        values = [str(summary.get(col, "")) for col in COLUMNS]
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                f"INSERT INTO reviews ({_COLS_SQL}) VALUES ({_PARAMS_SQL})",
+                values,
+            )
+            self._add_stats(conn, deltas([values]))
+            if self.outbox is not None:
+                self.outbox.enqueue(values, conn=conn)
+        if self.outbox is not None:
+            self.outbox.notify()
+        return cur.lastrowid
+
+    def load_all(self, periods=None):
+        where, params = "", []
+        if periods is not None:
+            if not periods:
+                return list(COLUMNS), []
+            clauses = []
+            for key in periods:
+                clauses.append("(timestamp >= ? AND timestamp < ?)")
+                params += self.partitioning.bounds(key)
+            where = "WHERE " + " OR ".join(clauses)
+        rows = self._conn().execute(
+            f"SELECT {_COLS_SQL} FROM reviews {where} ORDER BY id", params
+        ).fetchall()
+        return list(COLUMNS), [list(r) for r in rows]
+
+    def periods(self):
+        if not self.partitioning.enabled:
+            return []
+        # Timestamp selalu "YYYY-MM-DD HH:MM:SS" -> cukup lihat bulannya.
+        months = self._conn().execute(
+            "SELECT DISTINCT substr(timestamp, 1, 7) FROM reviews "
+            "WHERE timestamp != ''"
+        ).fetchall()
+        return sorted({self.partitioning.key_for(m + "-01") for (m,) in months})
+
+    def current_period(self):
+        if not self.partitioning.enabled:
+            return None
+        return self.partitioning.current_key()
+
+    def load_for_reviewer(self, reviewer_user: str):
+        rows = self._conn().execute(
+            f"SELECT {_COLS_SQL} FROM reviews WHERE reviewer_user = ? "
+            f"ORDER BY id",
+            (reviewer_user,),
+        ).fetchall()
+        return list(COLUMNS), [list(r) for r in rows]
+
+    def load_for_paper(self, content_hash: str):
+        rows = self._conn().execute(
+            f"SELECT {_COLS_SQL} FROM reviews WHERE content_hash = ? ORDER BY id",
+            (content_hash,),
+        ).fetchall()
+        return list(COLUMNS), [list(r) for r in rows]
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+    def version(self):
+        # Review hanya pernah ditambah, jadi (jumlah, id terakhir) cukup.
+        return tuple(
+            self._conn().execute("SELECT COUNT(*), MAX(id) FROM reviews").fetchone()
+        )
+
+    def stats(self):
+        rows = self._conn().execute(
+            "SELECT dimension, key, count FROM review_stats"
+        ).fetchall()
+        return Counter({(dimension, key): n for dimension, key, n in rows})
+
+    def rebuild_stats(self):
+        _, rows = self.load_all()
+        counts = deltas(rows)
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM review_stats")
+            self._add_stats(conn, counts)
+        return counts
+
+    # ---- seed dari Google Sheets -------------------------------------
+
+    def seeded(self) -> bool:
+        if not self._seeded:
+            self._seeded = self._conn().execute(
+                "SELECT 1 FROM meta WHERE key = 'seeded_at'"
+            ).fetchone() is not None
+        return self._seeded
+
+    def retry_seed(self, force=False) -> bool:
+        if self.seeded():
+            return True
+        with self._seed_lock:
+            due = (
+                force
+                or self._seed_attempt_at is None
+                or time.monotonic() - self._seed_attempt_at
+                >= self.seed_retry_interval
+            )
+            if due and not self.seeded():
+                self._seed_attempt_at = time.monotonic()
+                self._bootstrap_from_sheet(self._seed_pool)
+        return self.seeded()
+
+    def _bootstrap_from_sheet(self, pool):
+        sheet = PartitionedSheet(pool, self.partitioning, COLUMNS, ttl=0)
+        try:
+            parts = sheet.read(sheet.titles())
+        except Exception as e:
+            self.seed_error = f"{type(e).__name__}: {e}"
+            log.exception("Could not import existing reviews from Google Sheets")
+            return
+
+        # Review yang disimpan lokal selama impor belum berhasil sudah
+        # (atau akan) dikirim ke sheet oleh outbox; jangan diimpor dobel.
+        _, local = self.load_all()
+        known = Counter(tuple(r) for r in local)
+        rows = []
+        for title in parts:
+            for row in parts[title]:
+                if known[tuple(row)]:
+                    known[tuple(row)] -= 1
+                else:
+                    rows.append(row)
+
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO reviews ({_COLS_SQL}) VALUES ({_PARAMS_SQL})",
+                rows,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded_at', ?)",
+                (str(time.time()),),
+            )
+        self.seed_error = None
+        if rows:
+            self.rebuild_stats()
+        log.info("Imported %d reviews from Google Sheets", len(rows))
+
+
+def open_store(kind="sqlite", path=".data/reviews.db", pool=None, ttl=30.0,
+               mirror=True, partition="none") -> ReviewStore:
+    """
+    Buat store sesuai konfigurasi (`review_store` di secrets). Dengan
+    `mirror=True` tulisan ke sheet lewat SheetOutbox di file `path`.
+    `partition` ("none", "month" atau "semester") menentukan worksheet
+    tujuan review di Google Sheet.
+    """
+    pool = pool or get_pool()
+    partitioning = Partitioning(partition)
+    sheet = PartitionedSheet(pool, partitioning, COLUMNS, ttl=ttl)
+    if kind == "sheets":
+        # Agregat ikut di-update setiap batch review ditulis ke sheet.
+        stats_table = SheetStatsTable(pool, ttl=ttl)
+        sink = StatsSink(sheet, stats_table)
+        outbox = SheetOutbox(path, pool, sink=sink) if mirror else None
+        return SheetsReviewStore(
+            pool, ttl=ttl, outbox=outbox, sheet=sheet, stats_table=stats_table
+        )
+    outbox = SheetOutbox(path, pool, sink=sheet) if mirror else None
+    if kind == "sqlite":
+        return SQLiteReviewStore(
+            path, outbox=outbox, seed_pool=pool if mirror else None,
+            partitioning=partitioning,
+        )
+    raise ValueError(f"Unknown review_store: {kind!r} (use 'sqlite' or 'sheets')")
@@ -0,0 +1,223 @@
+"""
+Antrian tulis (write-behind) ke Google Sheets.
+
+Review dimasukkan dulu ke tabel `outbox` di SQLite lokal (durable, tahan
+restart), lalu worker background mengirimnya ke sheet dalam batch
+multi-baris. Kalau gagal (429 quota, network putus), batch dicoba lagi
+dengan exponential backoff; setelah `max_attempts` item dipindah ke tabel
+`dead_letter` supaya tidak memblokir antrian dan bisa di-retry manual.
+
+Tujuan tulis adalah `sink` (default: pool, yaitu sheet pertama); isi
+dengan PartitionedSheet supaya tiap review masuk ke worksheet periodenya.
+
+Diasumsikan hanya satu proses app yang menjalankan worker untuk satu file
+database (deployment Streamlit biasa).
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from analysis import COLUMNS
+from perf import recorder
+from sheet_utils import PartialAppendError
+
+log = logging.getLogger(__name__)
+
+
+class SheetOutbox:
+    def __init__(self, path, pool, batch_size=50, interval=2.0,
+                 base_delay=2.0, max_delay=300.0, max_attempts=8,
+                 start=True, sink=None):
+        self.path = path
+        self._sink = sink or pool
+        self.batch_size = batch_size
+        self.interval = interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self.last_error = None
+        self.last_flush_at = None
+        self.flushed = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._init_schema()
+        if start:
+            threading.Thread(
+                target=self._run, name="sheet-outbox", daemon=True
+            ).start()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "payload TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "next_attempt_at REAL NOT NULL DEFAULT 0, "
+                "last_error TEXT, "
+                "created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dead_letter ("
+                "id INTEGER PRIMARY KEY, "
+                "payload TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL, "
+                "last_error TEXT, "
+                "created_at REAL NOT NULL, "
+                "failed_at REAL NOT NULL)"
+            )
+
+    # ---- producer ----------------------------------------------------
+
+    def enqueue(self, row, conn=None) -> int:
+        """
+        Masukkan satu baris (list nilai sesuai `COLUMNS`) ke antrian.
+
+        `conn` boleh diisi koneksi ke file database yang sama supaya insert
+        review dan enqueue terjadi dalam satu transaksi.
+        """
+        own = conn is None
+        conn = conn or self._conn()
+        cur = conn.execute(
+            "INSERT INTO outbox (payload, created_at) VALUES (?, ?)",
+            (json.dumps([str(v) for v in row], ensure_ascii=False), time.time()),
+        )
+        if own:
+            conn.commit()
+        self._wake.set()
+        return cur.lastrowid
+
+    def notify(self):
+        """Bangunkan worker (mis. setelah enqueue lewat koneksi lain)."""
+        self._wake.set()
+
+    # ---- consumer ----------------------------------------------------
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    def flush_once(self) -> int:
+        """Kirim satu batch item yang sudah jatuh tempo. Kembalikan jumlahnya."""
+        with self._flush_lock:
+            conn = self._conn()
+            now = time.time()
+            batch = conn.execute(
+                "SELECT id, payload, attempts FROM outbox "
+                "WHERE next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (now, self.batch_size),
+            ).fetchall()
+            if not batch:
+                return 0
+
+            rows = [json.loads(payload) for _, payload, _ in batch]
+            try:
+                with recorder.stage("outbox.flush", rows=len(rows)):
+                    self._sink.append_rows(rows, COLUMNS)
+            except PartialAppendError as e:
+                # Sebagian sudah sampai di sheet: hapus yang itu saja,
+                # sisanya di-retry seperti biasa.
+                written = set(e.written)
+                self._delete(conn, [b for i, b in enumerate(batch) if i in written])
+                self._record_failure(
+                    conn, [b for i, b in enumerate(batch) if i not in written],
+                    e.error,
+                )
+                return len(written)
+            except Exception as e:
+                self._record_failure(conn, batch, e)
+                return 0
+
+            self._delete(conn, batch)
+            self.last_error = None
+            return len(batch)
+
+    def _delete(self, conn, batch):
+        with conn:
+            conn.executemany(
+                "DELETE FROM outbox WHERE id = ?", [(i,) for i, _, _ in batch]
+            )
+        self.flushed += len(batch)
+        self.last_flush_at = time.time()
+
+    def _record_failure(self, conn, batch, error):
+        self.last_error = f"{type(error).__name__}: {error}"
+        log.warning("Sheets append of %d rows failed: %s", len(batch), error)
+        now = time.time()
+        with conn:
+            for item_id, payload, attempts in batch:
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO dead_letter "
+                        "(id, payload, attempts, last_error, created_at, failed_at) "
+                        "SELECT id, payload, ?, ?, created_at, ? "
+                        "FROM outbox WHERE id = ?",
+                        (attempts, self.last_error, now, item_id),
+                    )
+                    conn.execute("DELETE FROM outbox WHERE id = ?", (item_id,))
+                else:
+                    conn.execute(
+                        "UPDATE outbox SET attempts = ?, next_attempt_at = ?, "
+                        "last_error = ? WHERE id = ?",
+                        (attempts, now + self._backoff(attempts),
+                         self.last_error, item_id),
+                    )
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                while self.flush_once() == self.batch_size:
+                    pass
+            except Exception:
+                log.exception("Sheet outbox worker error")
+
+    # ---- admin -------------------------------------------------------
+
+    def requeue_dead(self) -> int:
+        """Pindahkan semua item dead-letter kembali ke antrian."""
+        conn = self._conn()
+        with conn:
+            moved = conn.execute(
+                "INSERT INTO outbox (payload, created_at) "
+                "SELECT payload, created_at FROM dead_letter ORDER BY id"
+            ).rowcount
+            conn.execute("DELETE FROM dead_letter")
+        self._wake.set()
+        return moved
+
+    def pending(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def dead(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM dead_letter"
+        ).fetchone()[0]
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending(),
+            "dead_letter": self.dead(),
+            "flushed": self.flushed,
+            "last_flush_at": self.last_flush_at,
+            "last_error": self.last_error,
+        }
@@ -1,15 +1,991 @@
-import gspread
-from google.oauth2.service_account import Credentials
-import streamlit as st
+import heapq
+import itertools
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# gspread, google-auth dan Streamlit baru di-import saat koneksi pertama
+# dibuka (lihat _connect_from_secrets), supaya import modul ini murah:
+# halaman login dan CLI tidak ikut membayar stack Sheets.
+from perf import approx_bytes, recorder
 
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive"
 ]
 
-def get_sheet():
+
+# Prioritas antrian rate limiter: angka kecil dilayani lebih dulu.
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+PRIORITY_SUMMARY = 2
+
+# Batas atas (detik) bucket histogram waktu tunggu.
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+
+class RateLimitTimeout(TimeoutError):
+    pass
+
+
+class PartialAppendError(Exception):
+    """
+    Append multi-worksheet yang hanya sebagian berhasil. `written` berisi
+    posisi (index di `rows` yang dikirim) baris yang sudah tertulis, jadi
+    pemanggil cukup mengirim ulang sisanya; `error` adalah penyebabnya.
+    """
+
+    def __init__(self, written, error):
+        super().__init__(f"{len(written)} rows written before failure: {error}")
+        self.written = written
+        self.error = error
+
+
+class RateLimiter:
+    """
+    Token bucket bersama untuk semua request Google Sheets di proses ini.
+
+    Caller yang harus menunggu diantrekan berdasarkan prioritas (write
+    dulu, baru read biasa, terakhir refresh summary), lalu urutan datang.
+    Jumlah call dan histogram waktu tunggu dicatat per endpoint.
+    """
+
+    def __init__(self, per_minute=60.0, burst=None):
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._endpoints = {}
+        self.set_rate(per_minute, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def set_rate(self, per_minute, burst=None):
+        with self._cond:
+            self.per_minute = float(per_minute)
+            self.burst = burst if burst is not None else max(1, int(per_minute) // 6)
+            self._cond.notify_all()
+
+    def _refill(self):
+        now = time.monotonic()
+        rate = self.per_minute / 60.0
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def acquire(self, endpoint="call", priority=PRIORITY_READ, timeout=None) -> float:
+        """Ambil satu token; kembalikan lama menunggu (detik)."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    self._refill()
+                    first = self._waiters[0] == ticket
+                    if first and self._tokens >= 1:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= 1
+                        break
+
+                    wait = None
+                    if first:
+                        wait = (1 - self._tokens) / (self.per_minute / 60.0)
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise RateLimitTimeout(
+                                f"Waited {timeout}s for Sheets quota ({endpoint})"
+                            )
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                raise
+            finally:
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self._record(endpoint, waited)
+        return waited
+
+    def _record(self, endpoint, waited):
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = {"calls": 0, "wait_total_s": 0.0,
+                     "wait_hist": [0] * (len(WAIT_BUCKETS) + 1)}
+            self._endpoints[endpoint] = stats
+        stats["calls"] += 1
+        stats["wait_total_s"] += waited
+        for i, upper in enumerate(WAIT_BUCKETS):
+            if waited <= upper:
+                stats["wait_hist"][i] += 1
+                break
+        else:
+            stats["wait_hist"][-1] += 1
+
+    def stats(self) -> dict:
+        with self._cond:
+            self._refill()
+            labels = [f"<={b}s" for b in WAIT_BUCKETS] + [f">{WAIT_BUCKETS[-1]}s"]
+            return {
+                "per_minute": self.per_minute,
+                "burst": self.burst,
+                "tokens": round(self._tokens, 2),
+                "waiting": len(self._waiters),
+                "endpoints": {
+                    name: {
+                        "calls": ep["calls"],
+                        "wait_total_s": round(ep["wait_total_s"], 3),
+                        "wait_hist": dict(zip(labels, ep["wait_hist"])),
+                    }
+                    for name, ep in self._endpoints.items()
+                },
+            }
+
+
+def _connect_from_secrets():
+    """
+    Buka spreadsheet berdasarkan ID dari st.secrets.
+
+    ID bisa disimpan di:
+    - st.secrets["google_sheet_id"]  (top-level), atau
+    - st.secrets["google_service_account"]["google_sheet_id"]
+    """
+    import gspread
+    import streamlit as st
+    from google.oauth2.service_account import Credentials
+
     info = st.secrets["google_service_account"]
     credentials = Credentials.from_service_account_info(info, scopes=SCOPES)
     client = gspread.authorize(credentials)
-    sheet_id = st.secrets["google_sheet_id"]
-    return client.open_by_key(sheet_id).sheet1
+
+    sheet_id = st.secrets.get("google_sheet_id", None)
+    if sheet_id is None:
+        sheet_id = info.get("google_sheet_id", None)
+
+    if sheet_id is None:
+        raise KeyError(
+            'google_sheet_id not found in secrets. '
+            'Tambahkan "google_sheet_id = \\"...ID...\\"" di secrets '
+            "atau di dalam [google_service_account]."
+        )
+
+    return client.open_by_key(sheet_id)
+
+
+_RANGE_END_ROW = re.compile(r"(\d+)$")
+
+
+def _last_row_from_response(response) -> int:
+    """
+    Ambil nomor baris terakhir dari response append, mis.
+    `{"updates": {"updatedRange": "Sheet1!A12:AB12"}}` -> 12.
+    """
+    updated = response["updates"]["updatedRange"]
+    match = _RANGE_END_ROW.search(updated)
+    if match is None:
+        raise ValueError(f"Unexpected updatedRange in append response: {updated}")
+    return int(match.group(1))
+
+
+def _col_letter(n: int) -> str:
+    """1 -> A, 28 -> AB."""
+    letters = ""
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+class SheetSnapshot:
+    """
+    Salinan isi satu worksheet yang dipakai bersama semua session.
+
+    Setelah TTL habis (atau setelah invalidate), refresh hanya mengambil
+    baris setelah jumlah baris yang sudah diketahui. Full reload tetap
+    dilakukan tiap `full_every` detik supaya baris yang diedit/dihapus
+    langsung di spreadsheet ikut terbaca.
+    """
+
+    def __init__(self, pool, title=None, ttl=30.0, full_every=600.0):
+        self._pool = pool
+        self._title = title
+        self.ttl = ttl
+        self.full_every = full_every
+        self._lock = threading.Lock()
+        self._header = []
+        self._rows = []
+        self._synced_at = None
+        self._full_at = None
+        self._stale = True
+        self.version = 0
+        self.full_loads = 0
+        self.incremental_loads = 0
+
+    def invalidate(self):
+        self._stale = True
+
+    def age(self):
+        """Detik sejak sinkron terakhir, atau None kalau belum pernah."""
+        if self._synced_at is None:
+            return None
+        return time.monotonic() - self._synced_at
+
+    def _needs_refresh(self) -> bool:
+        if self._stale or self._synced_at is None:
+            return True
+        return self.age() >= self.ttl
+
+    def cached(self):
+        """(header, rows) kalau snapshot masih segar, tanpa baca sheet."""
+        with self._lock:
+            if self._needs_refresh():
+                return None
+            return list(self._header), list(self._rows)
+
+    def get(self):
+        """Kembalikan (header, rows), refresh dulu kalau sudah basi."""
+        with self._lock:
+            if self._needs_refresh():
+                self._refresh()
+            return list(self._header), list(self._rows)
+
+    def _refresh(self):
+        now = time.monotonic()
+        full = (
+            not self._header
+            or self._full_at is None
+            or now - self._full_at >= self.full_every
+        )
+
+        if full:
+            values = self._pool.call(
+                lambda w: w.get_all_values(), title=self._title,
+                endpoint="get_all_values", priority=PRIORITY_SUMMARY,
+            )
+            self._header = values[0] if values else []
+            self._rows = values[1:]
+            self._full_at = now
+            self.full_loads += 1
+        else:
+            width = len(self._header)
+            start = len(self._rows) + 2  # +1 header, +1 baris berikutnya
+            rng = f"A{start}:{_col_letter(width)}"
+            new_rows = self._pool.call(
+                lambda w: w.get(rng), title=self._title,
+                endpoint="get", priority=PRIORITY_SUMMARY,
+            )
+            for row in new_rows:
+                row = list(row)
+                if len(row) < width:
+                    row += [""] * (width - len(row))
+                self._rows.append(row)
+            self.incremental_loads += 1
+            if not new_rows:
+                self._synced_at = now
+                self._stale = False
+                return
+
+        self._synced_at = now
+        self._stale = False
+        self.version += 1
+
+    def stats(self) -> dict:
+        return {
+            "rows": len(self._rows),
+            "version": self.version,
+            "age_s": self.age(),
+            "ttl_s": self.ttl,
+            "full_loads": self.full_loads,
+            "incremental_loads": self.incremental_loads,
+        }
+
+
+def coalesce_rows(row_numbers) -> list:
+    """[2, 3, 4, 9, 10] -> [(2, 4), (9, 10)]."""
+    ranges = []
+    for row in sorted(set(row_numbers)):
+        if ranges and row == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], row)
+        else:
+            ranges.append((row, row))
+    return ranges
+
+
+class ColumnIndex:
+    """
+    Index `nilai kolom -> nomor baris` untuk satu kolom worksheet,
+    dipelihara secara incremental seperti SheetSnapshot (yang dibaca
+    hanya satu kolom itu). Dipakai untuk mengambil baris milik satu
+    reviewer saja lewat batch_get, tanpa mengunduh seluruh sheet.
+    """
+
+    def __init__(self, pool, column, title=None, ttl=30.0, full_every=600.0):
+        self._pool = pool
+        self.column = column
+        self._title = title
+        self.ttl = ttl
+        self.full_every = full_every
+        self._lock = threading.Lock()
+        self.header = []
+        self._values = []
+        self._rows_by_value = {}
+        self._synced_at = None
+        self._full_at = None
+        self._stale = True
+        # Naik setiap full reload: nomor baris lama mungkin sudah bergeser.
+        self.generation = 0
+
+    def invalidate(self):
+        self._stale = True
+
+    def _needs_refresh(self) -> bool:
+        if self._stale or self._synced_at is None:
+            return True
+        return time.monotonic() - self._synced_at >= self.ttl
+
+    def rows_for(self, value) -> list:
+        """Nomor baris sheet (1-based, header = 1) dengan kolom == value."""
+        with self._lock:
+            if self._needs_refresh():
+                self._refresh()
+            return list(self._rows_by_value.get(value, []))
+
+    def _add(self, values):
+        for value in values:
+            self._values.append(value)
+            row = len(self._values) + 1
+            self._rows_by_value.setdefault(value, []).append(row)
+
+    def _refresh(self):
+        now = time.monotonic()
+        full = (
+            not self.header
+            or self._full_at is None
+            or now - self._full_at >= self.full_every
+        )
+        if full:
+            self.header = self._pool.call(
+                lambda w: w.row_values(1), title=self._title,
+                endpoint="row_values", priority=PRIORITY_READ,
+            )
+            if self.column not in self.header:
+                raise KeyError(f"Column {self.column!r} not found in sheet header")
+            col = self.header.index(self.column) + 1
+            values = self._pool.call(
+                lambda w: w.col_values(col), title=self._title,
+                endpoint="col_values", priority=PRIORITY_READ,
+            )
+            self._values = []
+            self._rows_by_value = {}
+            self._add(values[1:])
+            self._full_at = now
+            self.generation += 1
+        else:
+            letter = _col_letter(self.header.index(self.column) + 1)
+            start = len(self._values) + 2
+            rng = f"{letter}{start}:{letter}"
+            new = self._pool.call(
+                lambda w: w.get(rng), title=self._title,
+                endpoint="get", priority=PRIORITY_READ,
+            )
+            self._add(row[0] if row else "" for row in new)
+
+        self._synced_at = now
+        self._stale = False
+
+    def fetch_rows(self, row_numbers) -> dict:
+        """
+        Ambil baris-baris tertentu dengan satu batch_get (baris yang
+        berurutan digabung jadi satu range). Kembalikan {nomor: row}.
+        """
+        if not row_numbers:
+            return {}
+        width = len(self.header)
+        last_col = _col_letter(width)
+        ranges = coalesce_rows(row_numbers)
+        results = self._pool.call(
+            lambda w: w.batch_get(
+                [f"A{start}:{last_col}{end}" for start, end in ranges]
+            ),
+            title=self._title,
+            endpoint="batch_get",
+            priority=PRIORITY_READ,
+        )
+        fetched = {}
+        for (start, end), values in zip(ranges, results):
+            values = list(values)
+            for offset in range(end - start + 1):
+                row = list(values[offset]) if offset < len(values) else []
+                fetched[start + offset] = row + [""] * (width - len(row))
+        return fetched
+
+
+def _write_header(ws, header):
+    # update() tidak memperlebar grid; worksheet lama mungkin kurang kolom.
+    cols = getattr(ws, "col_count", None)
+    if cols is not None and cols < len(header):
+        ws.add_cols(len(header) - cols)
+    return ws.update("A1", [header])
+
+
+def _status_code(error):
+    """Status HTTP dari APIError gspread (atribut beda antar versi), atau None."""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def _needs_reconnect(error) -> bool:
+    """
+    True hanya untuk error koneksi atau auth, yang bisa sembuh dengan
+    koneksi baru. 429/quota dan error API lain di-raise apa adanya:
+    membuka koneksi ulang hanya menambah request ke quota yang sama.
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status == 401
+    if type(error).__module__.startswith("google.auth"):
+        return True  # RefreshError, TransportError
+    return isinstance(error, (ConnectionError, TimeoutError, OSError))
+
+
+def _measured(endpoint, fn, target, *args, **kwargs):
+    """Satu request Sheets API: dihitung, diukur, dan ukuran balasannya dicatat."""
+    name = f"sheets.{endpoint}"
+    recorder.count(name)
+    with recorder.stage(name):
+        result = fn(target, *args, **kwargs)
+    recorder.add_bytes(name, approx_bytes(result))
+    return result
+
+
+class SheetPool:
+    """
+    Satu handle spreadsheet/worksheet per proses, dipakai bersama oleh
+    semua session Streamlit.
+
+    Client gspread memakai AuthorizedSession dari google-auth, jadi token
+    OAuth di-refresh otomatis saat expired tanpa authorize ulang. Kalau
+    sebuah call gagal karena koneksi atau auth, handle dibuang dan
+    koneksi dibuat ulang.
+    """
+
+    def __init__(self, connect=None, limiter=None):
+        self._connect = connect or _connect_from_secrets
+        self.limiter = limiter or RateLimiter()
+        # _lock hanya melindungi cache di memori dan tidak pernah dipegang
+        # selama menunggu rate limiter atau request ke API.
+        self._lock = threading.RLock()
+        self._connect_lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        self._spreadsheet = None
+        self._worksheets = {}
+        self._connected_at = None
+        self._headers = set()
+        self._last_rows = {}
+        self._snapshots = {}
+        self._indexes = {}
+        self.hits = 0
+        self.misses = 0
+        self.reconnects = 0
+
+    def set_connector(self, connect):
+        """Ganti factory koneksi (mis. fake worksheet untuk benchmark)."""
+        with self._lock:
+            self._connect = connect
+            self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._spreadsheet = None
+            self._worksheets = {}
+            self._connected_at = None
+
+    def spreadsheet(self):
+        with self._lock:
+            if self._spreadsheet is not None:
+                return self._spreadsheet
+        # Hanya pemanggil yang juga butuh koneksi yang menunggu di sini.
+        with self._connect_lock:
+            with self._lock:
+                if self._spreadsheet is not None:
+                    return self._spreadsheet
+            self.limiter.acquire("open_by_key", PRIORITY_READ)
+            with recorder.stage("sheets.connect"):
+                sh = self._connect()
+            with self._lock:
+                self._spreadsheet = sh
+                self._connected_at = time.monotonic()
+            return sh
+
+    def worksheet(self, title=None):
+        """
+        Kembalikan worksheet `title` (default: sheet pertama) dari cache.
+        """
+        with self._lock:
+            ws = self._worksheets.get(title)
+            if ws is not None:
+                self.hits += 1
+                return ws
+            self.misses += 1
+
+        sh = self.spreadsheet()
+        # sh.sheet1 juga satu request metadata, jadi ikut rate limiter.
+        self.limiter.acquire("worksheet", PRIORITY_READ)
+        ws = _measured(
+            "worksheet",
+            lambda s: s.sheet1 if title is None else s.worksheet(title),
+            sh,
+        )
+        with self._lock:
+            return self._worksheets.setdefault(title, ws)
+
+    def call(self, fn, *args, title=None, retry=True, endpoint="call",
+             priority=PRIORITY_READ, **kwargs):
+        """
+        Jalankan `fn(ws, *args, **kwargs)` dengan worksheet dari pool.
+
+        Setiap percobaan mengambil satu token dari rate limiter bersama
+        (`endpoint` dan `priority` dipakai untuk antrian dan statistik).
+        Kalau gagal karena koneksi atau auth, koneksi di-reset; error lain
+        (termasuk 429/quota) langsung di-raise. Dengan `retry=True` call
+        diulang sekali pakai koneksi baru; write yang tidak idempotent
+        sebaiknya memakai `retry=False` supaya tidak tertulis dua kali.
+        """
+        ws = self.worksheet(title)
+        self.limiter.acquire(endpoint, priority)
+        try:
+            return _measured(endpoint, fn, ws, *args, **kwargs)
+        except Exception as e:
+            if not _needs_reconnect(e):
+                raise
+            with self._lock:
+                self.reconnects += 1
+                self.reset()
+            if not retry:
+                raise
+            ws = self.worksheet(title)
+            self.limiter.acquire(endpoint, priority)
+            return _measured(endpoint, fn, ws, *args, **kwargs)
+
+    def call_spreadsheet(self, fn, *args, retry=True, endpoint="call",
+                         priority=PRIORITY_READ, **kwargs):
+        """Seperti `call`, tapi `fn` menerima objek spreadsheet."""
+        sh = self.spreadsheet()
+        self.limiter.acquire(endpoint, priority)
+        try:
+            return _measured(endpoint, fn, sh, *args, **kwargs)
+        except Exception as e:
+            if not _needs_reconnect(e):
+                raise
+            with self._lock:
+                self.reconnects += 1
+                self.reset()
+            if not retry:
+                raise
+            sh = self.spreadsheet()
+            self.limiter.acquire(endpoint, priority)
+            return _measured(endpoint, fn, sh, *args, **kwargs)
+
+    def ensure_worksheet(self, title, cols=26):
+        """Ambil worksheet `title`, buat dulu kalau belum ada."""
+        from gspread.exceptions import WorksheetNotFound
+
+        try:
+            return self.worksheet(title)
+        except WorksheetNotFound:
+            pass
+        # Serialisasi pembuatan saja (jarang), bukan semua akses pool.
+        with self._create_lock:
+            try:
+                return self.worksheet(title)
+            except WorksheetNotFound:
+                pass
+            ws = self.call_spreadsheet(
+                lambda sh: sh.add_worksheet(title=title, rows=1000, cols=cols),
+                retry=False, endpoint="add_worksheet", priority=PRIORITY_WRITE,
+            )
+            with self._lock:
+                self._worksheets[title] = ws
+            return ws
+
+    def ensure_header(self, header, title=None):
+        """
+        Tulis header di A1 kalau baris pertama masih kosong, atau kalau
+        baris pertama adalah header lama yang lebih pendek (kolom baru
+        ditambah di ujung `COLUMNS`).
+        Cukup dicek sekali per worksheet per proses (hanya baca baris 1).
+        """
+        with self._lock:
+            if title in self._headers:
+                return
+        # Dua pemanggil bersamaan paling buruk menulis header yang sama
+        # dua kali; lock pool tidak dipegang selama request.
+        first = self.call(
+            lambda w: w.row_values(1), title=title,
+            endpoint="row_values", priority=PRIORITY_WRITE,
+        )
+        header = list(header)
+        if not first or (
+            len(first) < len(header) and first == header[:len(first)]
+        ):
+            self.call(
+                lambda w: _write_header(w, header), title=title,
+                endpoint="update", priority=PRIORITY_WRITE,
+            )
+        with self._lock:
+            self._headers.add(title)
+
+    def append_rows(self, rows, header, title=None) -> int:
+        """
+        Tambahkan baris di bawah tabel tanpa membaca isi sheet dulu.
+
+        Kembalikan nomor baris (1-based, termasuk header) dari baris
+        pertama yang ditulis. Tidak di-retry otomatis supaya tidak dobel.
+        """
+        self.ensure_header(header, title)
+        recorder.add_bytes("sheets.append_rows.sent", approx_bytes(rows))
+        response = self.call(
+            lambda w: w.append_rows(
+                rows, value_input_option="RAW", table_range="A1"
+            ),
+            title=title,
+            retry=False,
+            endpoint="append_rows",
+            priority=PRIORITY_WRITE,
+        )
+        last_row = _last_row_from_response(response)
+        with self._lock:
+            self._last_rows[title] = max(self._last_rows.get(title, 0), last_row)
+            listeners = [self._snapshots.get(title)] + [
+                index for (t, _), index in self._indexes.items() if t == title
+            ]
+        for listener in listeners:
+            if listener is not None:
+                listener.invalidate()
+        return last_row - len(rows) + 1
+
+    def snapshot(self, title=None, ttl=30.0) -> SheetSnapshot:
+        """
+        Snapshot bersama untuk worksheet `title`; dibuat sekali per proses.
+        `ttl` terbaru selalu dipakai supaya bisa diubah lewat secrets.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(title)
+            if snapshot is None:
+                snapshot = SheetSnapshot(self, title=title, ttl=ttl)
+                self._snapshots[title] = snapshot
+            snapshot.ttl = ttl
+            return snapshot
+
+    def column_index(self, column, title=None, ttl=30.0) -> ColumnIndex:
+        """Index bersama `column -> baris` untuk worksheet `title`."""
+        with self._lock:
+            index = self._indexes.get((title, column))
+            if index is None:
+                index = ColumnIndex(self, column, title=title, ttl=ttl)
+                self._indexes[(title, column)] = index
+            index.ttl = ttl
+            return index
+
+    def row_count(self, title=None):
+        """
+        Jumlah baris data (tanpa header) yang terakhir diketahui dari
+        append, atau None kalau proses ini belum pernah menulis.
+        """
+        with self._lock:
+            last_row = self._last_rows.get(title)
+        if last_row is None:
+            return None
+        return max(last_row - 1, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            age = None
+            if self._connected_at is not None:
+                age = time.monotonic() - self._connected_at
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reconnects": self.reconnects,
+                "connected": self._spreadsheet is not None,
+                "connection_age_s": age,
+                "rate_limit": self.limiter.stats(),
+            }
+
+
+class Partitioning:
+    """
+    Aturan pembagian review per periode waktu: "month" (reviews_2025-10),
+    "semester" (reviews_2025-S2, S1 = Jan-Jun) atau "none" (semua di
+    sheet pertama seperti dulu). Key periode diurutkan kronologis.
+    """
+
+    SCHEMES = ("none", "month", "semester")
+
+    def __init__(self, scheme="semester", prefix="reviews_"):
+        if scheme not in self.SCHEMES:
+            raise ValueError(f"Unknown partition scheme: {scheme!r}")
+        self.scheme = scheme
+        self.prefix = prefix
+
+    @property
+    def enabled(self) -> bool:
+        return self.scheme != "none"
+
+    def key_for(self, timestamp=None) -> str:
+        """Key periode untuk timestamp "YYYY-MM-DD HH:MM:SS" (default: sekarang)."""
+        try:
+            year, month = int(timestamp[:4]), int(timestamp[5:7])
+        except (TypeError, ValueError):
+            now = datetime.now()
+            year, month = now.year, now.month
+        if self.scheme == "month":
+            return f"{year}-{month:02d}"
+        return f"{year}-S{1 if month <= 6 else 2}"
+
+    def current_key(self) -> str:
+        return self.key_for(None)
+
+    def title_for(self, timestamp=None):
+        """Judul worksheet tujuan; None = sheet pertama (mode "none")."""
+        if not self.enabled:
+            return None
+        return self.prefix + self.key_for(timestamp)
+
+    def key_of_title(self, title):
+        if title is None:
+            return "legacy"
+        if title.startswith(self.prefix):
+            return title[len(self.prefix):]
+        return None
+
+    def bounds(self, key):
+        """Rentang timestamp [start, end) untuk satu key periode."""
+        year = int(key[:4])
+        if self.scheme == "month":
+            month = int(key[5:7])
+            start = (year, month)
+            end = (year + 1, 1) if month == 12 else (year, month + 1)
+        elif key.endswith("S1"):
+            start, end = (year, 1), (year, 7)
+        else:
+            start, end = (year, 7), (year + 1, 1)
+        return (
+            f"{start[0]:04d}-{start[1]:02d}-01 00:00:00",
+            f"{end[0]:04d}-{end[1]:02d}-01 00:00:00",
+        )
+
+
+def align_rows(header, rows, columns):
+    """Susun ulang rows (dengan `header`) menjadi urutan `columns`."""
+    if list(header) == list(columns):
+        return [r + [""] * (len(columns) - len(r)) for r in rows]
+    index = [header.index(c) if c in header else None for c in columns]
+    return [
+        [r[i] if i is not None and i < len(r) else "" for i in index]
+        for r in rows
+    ]
+
+
+class PartitionedSheet:
+    """
+    Review yang dibagi ke beberapa worksheet per periode dalam satu
+    spreadsheet.
+
+    - Tulis: tiap baris diarahkan ke worksheet periodenya (dibuat kalau
+      belum ada) lewat append.
+    - Baca: hanya worksheet yang diminta. Periode berjalan memakai
+      SheetSnapshot (TTL); periode lama jarang berubah, jadi diambil
+      sekali lalu di-cache sampai ada append ke worksheet itu. Periode lama yang
+      belum ter-cache diambil dengan values_batch_get (beberapa sheet per
+      request), beberapa request berjalan paralel.
+    - Sheet pertama yang bukan partisi diperlakukan sebagai periode
+      "legacy" (data sebelum partisi diaktifkan).
+    """
+
+    def __init__(self, pool, partitioning, header, ttl=30.0, list_ttl=300.0,
+                 workers=4, sheets_per_request=5):
+        self._pool = pool
+        self.partitioning = partitioning
+        self.header = list(header)
+        self.ttl = ttl
+        self.list_ttl = list_ttl
+        self.workers = workers
+        self.sheets_per_request = sheets_per_request
+        self._ts_index = self.header.index("timestamp")
+        self._lock = threading.Lock()
+        self._titles = None
+        self._titles_at = None
+        self._legacy = False
+        self._frozen = {}
+        self._writes = 0
+
+    # ---- daftar partisi ----------------------------------------------
+
+    def titles(self) -> list:
+        """Semua partisi urut kronologis; None = sheet pertama/legacy."""
+        if not self.partitioning.enabled:
+            return [None]
+        with self._lock:
+            stale = (
+                self._titles is None
+                or time.monotonic() - self._titles_at >= self.list_ttl
+            )
+            if stale:
+                sheets = self._pool.call_spreadsheet(
+                    lambda sh: sh.worksheets(), endpoint="worksheets"
+                )
+                self._titles = {ws.title for ws in sheets}
+                self._legacy = bool(sheets) and (
+                    self.partitioning.key_of_title(sheets[0].title) is None
+                )
+                self._titles_at = time.monotonic()
+            titles = sorted(
+                t for t in self._titles
+                if self.partitioning.key_of_title(t) is not None
+            )
+            return ([None] if self._legacy else []) + titles
+
+    def key_of(self, title):
+        return self.partitioning.key_of_title(title)
+
+    def current_title(self):
+        return self.partitioning.title_for(None)
+
+    def is_closed(self, title) -> bool:
+        if not self.partitioning.enabled:
+            return False
+        return title != self.current_title()
+
+    # ---- tulis ---------------------------------------------------------
+
+    def append_rows(self, rows, header=None):
+        """
+        Append ke worksheet periode masing-masing baris (satu append per
+        worksheet). Kalau append ke salah satu worksheet gagal setelah
+        worksheet lain berhasil, raise PartialAppendError berisi posisi
+        baris yang sudah tertulis supaya tidak dikirim dua kali.
+        """
+        groups = {}
+        for i, row in enumerate(rows):
+            title = self.partitioning.title_for(row[self._ts_index])
+            groups.setdefault(title, []).append(i)
+        written = []
+        for title, positions in groups.items():
+            try:
+                if title is not None:
+                    self._pool.ensure_worksheet(title, cols=len(self.header))
+                    with self._lock:
+                        if self._titles is not None:
+                            self._titles.add(title)
+                self._pool.append_rows(
+                    [rows[i] for i in positions], header or self.header,
+                    title=title,
+                )
+            except Exception as e:
+                if not written:
+                    raise
+                raise PartialAppendError(written, e) from e
+            finally:
+                # Partisi yang baru ditulis (mis. review telat dari antrian)
+                # tidak boleh tetap dibaca dari cache lama.
+                with self._lock:
+                    self._frozen.pop(title, None)
+                    self._writes += 1
+            written += positions
+
+    # ---- baca ----------------------------------------------------------
+
+    def snapshot(self, title):
+        return self._pool.snapshot(title=title, ttl=self.ttl)
+
+    def read(self, titles) -> dict:
+        """{title: rows (urutan kolom = header)} untuk partisi yang diminta."""
+        result = {}
+        to_fetch = []
+        with self._lock:
+            writes = self._writes
+        existing = set(self.titles())
+        for title in titles:
+            if title not in existing:
+                result[title] = []  # belum ada review di periode ini
+            elif not self.is_closed(title):
+                result[title] = self._read_open(title)
+            elif title in self._frozen:
+                result[title] = self._frozen[title]
+            else:
+                to_fetch.append(title)
+
+        if to_fetch:
+            chunks = [
+                to_fetch[i:i + self.sheets_per_request]
+                for i in range(0, len(to_fetch), self.sheets_per_request)
+            ]
+            with ThreadPoolExecutor(max_workers=self.workers) as ex:
+                for chunk, values in zip(chunks, ex.map(self._batch_get, chunks)):
+                    for title, rows in zip(chunk, values):
+                        with self._lock:
+                            # Jangan cache hasil baca yang mungkin sudah
+                            # didahului append selama request berjalan.
+                            if self._writes == writes:
+                                self._frozen[title] = rows
+                        result[title] = rows
+        return result
+
+    def cached(self, title):
+        """Isi partisi lama yang sudah ter-cache (urutan kolom = header), atau None."""
+        with self._lock:
+            return self._frozen.get(title)
+
+    def _read_open(self, title):
+        header, rows = self.snapshot(title).get()
+        if not header:
+            return []
+        return align_rows(header, rows, self.header)
+
+    def _sheet_name(self, title):
+        if title is None:
+            title = self._pool.worksheet(None).title
+        return "'" + title.replace("'", "''") + "'"
+
+    def _batch_get(self, titles):
+        ranges = [self._sheet_name(t) for t in titles]
+        response = self._pool.call_spreadsheet(
+            lambda sh: sh.values_batch_get(ranges),
+            endpoint="values_batch_get",
+            priority=PRIORITY_SUMMARY,
+        )
+        out = []
+        for value_range in response.get("valueRanges", []):
+            values = value_range.get("values", [])
+            if not values:
+                out.append([])
+                continue
+            out.append(align_rows(values[0], values[1:], self.header))
+        return out
+
+
+_pool = SheetPool()
+
+
+def get_pool() -> SheetPool:
+    return _pool
+
+
+def configure(connect):
+    _pool.set_connector(connect)
+
+
+def get_sheet():
+    return _pool.worksheet()
+
+
+def append_row(values, header, title=None) -> int:
+    return _pool.append_rows([list(values)], header, title=title)